@@ -1,123 +1,844 @@
+import io
+import threading
+import time
+
+import numpy as np
 import pymysql
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 
 conn = pymysql.connect(
     host="localhost", user="root", password="Sql@3117", database="student_db"
 )
 cursor = conn.cursor()
 
+PASS_MARKS = 40
 
-def insert_student(name, age, subject, marks):
-    try:
+
+# Process-wide data version: every write bumps it, and every cached read is
+# keyed on it, so repeated page views are served from memory until a write.
+@st.cache_resource
+def data_version_store():
+    return {"version": 0, "lock": threading.Lock()}
+
+
+def data_version():
+    return data_version_store()["version"]
+
+
+def fresh_snapshot():
+    # The connection runs with autocommit off, so every read after the first
+    # shares one REPEATABLE READ snapshot. Cached loads end it first, so they
+    # see every write committed before the version they are cached under.
+    conn.commit()
+
+
+def bump_data_version():
+    store = data_version_store()
+    with store["lock"]:
+        store["version"] += 1
+
+
+# subject_stats is a per-subject summary kept in step with the student table
+# inside each write's transaction, so analytics cost O(#subjects).
+def add_to_subject_stats(student_id, subject, marks):
+    # Students without marks count towards student_count only
+    marked = marks is not None
+    cursor.execute(
+        "INSERT INTO subject_stats"
+        "(subject, student_count, marked_count, marks_sum, pass_count, max_marks, top_student_id) "
+        "VALUES(%s, 1, %s, %s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE "
+        "top_student_id = IF(VALUES(max_marks) IS NOT NULL AND (max_marks IS NULL "
+        "OR VALUES(max_marks) > max_marks "
+        "OR (VALUES(max_marks) = max_marks AND VALUES(top_student_id) < top_student_id)), "
+        "VALUES(top_student_id), top_student_id), "
+        "max_marks = IF(VALUES(max_marks) IS NOT NULL AND (max_marks IS NULL "
+        "OR VALUES(max_marks) > max_marks), VALUES(max_marks), max_marks), "
+        "student_count = student_count + 1, "
+        "marked_count = marked_count + VALUES(marked_count), "
+        "marks_sum = marks_sum + VALUES(marks_sum), "
+        "pass_count = pass_count + VALUES(pass_count)",
+        (
+            subject,
+            int(marked),
+            marks or 0,
+            int(marked and marks >= PASS_MARKS),
+            marks,
+            student_id,
+        ),
+    )
+
+
+def remove_from_subject_stats(student_id, subject, marks):
+    cursor.execute(
+        "UPDATE subject_stats SET student_count = student_count - 1, "
+        "marked_count = marked_count - %s, "
+        "marks_sum = marks_sum - %s, pass_count = pass_count - %s "
+        "WHERE subject = %s",
+        (
+            int(marks is not None),
+            marks or 0,
+            int(marks is not None and marks >= PASS_MARKS),
+            subject,
+        ),
+    )
+    cursor.execute(
+        "DELETE FROM subject_stats WHERE subject = %s AND student_count <= 0",
+        (subject,),
+    )
+    # Losing the top scorer needs one indexed lookup for the runner-up
+    cursor.execute(
+        "SELECT top_student_id FROM subject_stats WHERE subject = %s", (subject,)
+    )
+    row = cursor.fetchone()
+    if row is not None and row[0] == student_id:
         cursor.execute(
-            "SELECT id FROM student WHERE name = %s AND age = %s AND subject = %s",
-            (name, age, subject),
+            "SELECT id, marks FROM student WHERE subject = %s "
+            "ORDER BY marks DESC, id LIMIT 1",
+            (subject,),
         )
-        if cursor.fetchone() is not None:
-            st.warning("⚠️ Student with same name, age, and subject already exists!")
+        top = cursor.fetchone()
+        cursor.execute(
+            "UPDATE subject_stats SET top_student_id = %s, max_marks = %s "
+            "WHERE subject = %s",
+            (top[0] if top else None, top[1] if top else None, subject),
+        )
+
+
+def rebuild_subject_stats(subjects=None):
+    where, params = " WHERE s.subject IS NOT NULL", [PASS_MARKS]
+    if subjects is not None:
+        subjects = list(subjects)
+        if not subjects:
             return
+        placeholders = ", ".join(["%s"] * len(subjects))
+        where += f" AND s.subject IN ({placeholders})"
+        params.extend(subjects)
+        cursor.execute(
+            f"DELETE FROM subject_stats WHERE subject IN ({placeholders})", subjects
+        )
+    else:
+        cursor.execute("DELETE FROM subject_stats")
+    cursor.execute(
+        "INSERT INTO subject_stats"
+        "(subject, student_count, marked_count, marks_sum, pass_count, max_marks, top_student_id) "
+        "SELECT s.subject, COUNT(*), COUNT(s.marks), COALESCE(SUM(s.marks), 0), "
+        "COALESCE(SUM(s.marks >= %s), 0), MAX(s.marks), "
+        "(SELECT t.id FROM student t WHERE t.subject = s.subject "
+        "ORDER BY t.marks DESC, t.id LIMIT 1) "
+        f"FROM student s{where} GROUP BY s.subject",
+        params,
+    )
+
+
+def repair_subject_stats():
+    try:
+        rebuild_subject_stats()
+        conn.commit()
+        bump_data_version()
+        st.success("✅ Subject statistics rebuilt from the student table!")
+    except Exception as e:
+        conn.rollback()
+        st.error(f"❌ Error rebuilding subject statistics: {e}")
+
+
+def insert_student(name, age, subject, marks):
+    try:
         cursor.execute(
             "INSERT INTO student(name, age, subject, marks) VALUES(%s, %s, %s, %s)",
             (name, age, subject, marks),
         )
+        add_to_subject_stats(cursor.lastrowid, subject, marks)
         conn.commit()
+        bump_data_version()
         st.success("✅ Student added successfully!")
+    except pymysql.err.IntegrityError as e:
+        conn.rollback()
+        # 1062: rejected by the UNIQUE(name, age, subject) index
+        if e.args[0] == 1062:
+            st.warning("⚠️ Student with same name, age, and subject already exists!")
+        else:
+            st.error(f"❌ Error adding student: {e}")
     except Exception as e:
+        conn.rollback()
         st.error(f"❌ Error adding student: {e}")
 
 
+IMPORT_COLUMNS = ["name", "age", "subject", "marks"]
+IMPORT_QUERIES = {
+    "Skip": "INSERT IGNORE INTO student(name, age, subject, marks) VALUES(%s, %s, %s, %s)",
+    "Update marks": (
+        "INSERT INTO student(name, age, subject, marks) VALUES(%s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE marks = VALUES(marks)"
+    ),
+}
+
+
+def read_student_chunks(file, file_name, chunk_size):
+    if file_name.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(file, chunksize=chunk_size)
+
+
+def validate_student_chunk(chunk, first_row):
+    chunk = chunk.rename(columns=lambda column: str(column).strip().lower())
+    missing = [column for column in IMPORT_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+    df = pd.DataFrame(
+        {
+            "name": chunk["name"].astype("string").str.strip(),
+            "age": pd.to_numeric(chunk["age"], errors="coerce"),
+            "subject": chunk["subject"].astype("string").str.strip(),
+            "marks": pd.to_numeric(chunk["marks"], errors="coerce"),
+        }
+    )
+    df.index = pd.RangeIndex(first_row, first_row + len(df), name="Row")
+
+    # First failing rule per row, evaluated column-wise over the whole chunk
+    reasons = np.select(
+        [
+            df["name"].fillna("").eq("").to_numpy(dtype=bool),
+            df["name"].str.len().gt(20).fillna(False).to_numpy(dtype=bool),
+            df["subject"].fillna("").eq("").to_numpy(dtype=bool),
+            df["subject"].str.len().gt(20).fillna(False).to_numpy(dtype=bool),
+            ~df["age"].between(5, 50).to_numpy() | (df["age"] % 1 != 0).to_numpy(),
+            ~df["marks"].between(0, 100).to_numpy() | (df["marks"] % 1 != 0).to_numpy(),
+        ],
+        [
+            "Missing name",
+            "Name longer than 20 characters",
+            "Missing subject",
+            "Subject longer than 20 characters",
+            "Age must be a whole number between 5 and 50",
+            "Marks must be a whole number between 0 and 100",
+        ],
+        default="",
+    )
+    valid = reasons == ""
+    rejected = chunk.set_axis(df.index).loc[~valid].copy()
+    rejected["Reason"] = reasons[~valid]
+    df = df.loc[valid].astype({"age": int, "marks": int})
+    return df, rejected
+
+
+def import_students(
+    file, file_name, on_duplicate="Skip", chunk_size=5000, batch_size=1000
+):
+    query = IMPORT_QUERIES[on_duplicate]
+    report = {"read": 0, "inserted": 0, "duplicates": 0, "written": 0, "affected": 0}
+    rejected_chunks = []
+    start = time.perf_counter()
+    try:
+        for chunk in read_student_chunks(file, file_name, chunk_size):
+            valid, rejected = validate_student_chunk(chunk, report["read"] + 1)
+            report["read"] += len(chunk)
+            if not rejected.empty:
+                rejected_chunks.append(rejected)
+            rows = list(valid.itertuples(index=False, name=None))
+            for i in range(0, len(rows), batch_size):
+                batch = rows[i : i + batch_size]
+                # executemany folds the batch into one multi-row INSERT
+                affected = cursor.executemany(query, batch)
+                if on_duplicate == "Skip":
+                    report["inserted"] += affected
+                    report["duplicates"] += len(batch) - affected
+                else:
+                    # ON DUPLICATE KEY UPDATE reports 1 per insert, 2 per changed
+                    # row and 0 per unchanged row, so inserts and updates can't
+                    # be told apart from the count
+                    report["written"] += len(batch)
+                    report["affected"] += affected
+            rebuild_subject_stats(valid["subject"].unique().tolist())
+            conn.commit()
+    except Exception as e:
+        conn.rollback()
+        st.error(f"❌ Error importing students: {e}")
+    finally:
+        if report["inserted"] or report["written"]:
+            bump_data_version()
+
+    elapsed = time.perf_counter() - start
+    report["seconds"] = elapsed
+    report["rows_per_sec"] = report["read"] / elapsed if elapsed > 0 else 0
+    report["rejected"] = (
+        pd.concat(rejected_chunks) if rejected_chunks else pd.DataFrame()
+    )
+    return report
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_all_students(version):
+    fresh_snapshot()
+    cursor.execute("SELECT id, name, age, subject, marks FROM student")
+    data = cursor.fetchall()
+    if data:
+        return pd.DataFrame(data, columns=["ID", "Name", "Age", "Subject", "Marks"])
+    return None
+
+
 def get_all_students():
     try:
-        cursor.execute("SELECT id, name, age, subject, marks FROM student")
-        data = cursor.fetchall()
-        if data:
-            return pd.DataFrame(data, columns=["ID", "Name", "Age", "Subject", "Marks"])
-        return None
+        return load_all_students(data_version())
     except Exception as e:
         st.error(f"Error retrieving students: {e}")
         return None
 
 
+STUDENT_COLUMNS = ["ID", "Name", "Age", "Subject", "Marks"]
+SORT_COLUMNS = {
+    "ID": "id",
+    "Name": "name",
+    "Age": "age",
+    "Subject": "subject",
+    "Marks": "marks",
+}
+PAGE_SIZES = [10, 25, 50, 100]
+
+
+def student_filter(subject=None, name=None):
+    clauses, params = [], []
+    if subject:
+        clauses.append("subject = %s")
+        params.append(subject)
+    if name:
+        clauses.append("name LIKE %s")
+        params.append(f"{name}%")
+    return clauses, params
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def load_student_count(version, subject, name):
+    fresh_snapshot()
+    clauses, params = student_filter(subject, name)
+    query = "SELECT COUNT(*) FROM student"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    cursor.execute(query, params)
+    return cursor.fetchone()[0]
+
+
+def count_students(subject=None, name=None):
+    try:
+        return load_student_count(data_version(), subject, name)
+    except Exception as e:
+        st.error(f"Error counting students: {e}")
+        return 0
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_subjects(version):
+    fresh_snapshot()
+    cursor.execute("SELECT DISTINCT subject FROM student ORDER BY subject")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_subjects():
+    try:
+        return load_subjects(data_version())
+    except Exception as e:
+        st.error(f"Error retrieving subjects: {e}")
+        return []
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def load_students_page(version, after, page_size, sort_by, descending, subject, name):
+    # Keyset pagination: `after` is the (sort value, id) of the previous page's
+    # last row, so each page is an index range scan instead of an OFFSET skip.
+    fresh_snapshot()
+    column = SORT_COLUMNS[sort_by]
+    clauses, params = student_filter(subject, name)
+    op, order = ("<", "DESC") if descending else (">", "ASC")
+    if after is not None:
+        if column == "id":
+            clauses.append(f"id {op} %s")
+            params.append(after[1])
+        else:
+            clauses.append(f"({column}, id) {op} (%s, %s)")
+            params.extend(after)
+    query = "SELECT id, name, age, subject, marks FROM student"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += f" ORDER BY {column} {order}, id {order} LIMIT %s"
+    params.append(page_size)
+    cursor.execute(query, params)
+    data = cursor.fetchall()
+    df = pd.DataFrame(data, columns=STUDENT_COLUMNS)
+    next_key = None
+    if len(data) == page_size:
+        last = data[-1]
+        next_key = (last[STUDENT_COLUMNS.index(sort_by)], last[0])
+    return df, next_key
+
+
+def get_students_page(
+    after=None, page_size=25, sort_by="ID", descending=False, subject=None, name=None
+):
+    try:
+        return load_students_page(
+            data_version(), after, page_size, sort_by, descending, subject, name
+        )
+    except Exception as e:
+        st.error(f"Error retrieving students: {e}")
+        return pd.DataFrame(columns=STUDENT_COLUMNS), None
+
+
+UPDATE_FIELDS = {
+    "Name": "name",
+    "Age": "age",
+    "Subject": "subject",
+    "Marks": "marks",
+}
+
+
 def update_student_field(student_id, field, new_value):
     try:
         # Check if student exists
-        cursor.execute("SELECT id FROM student WHERE id = %s", (student_id,))
-        if cursor.fetchone() is None:
+        cursor.execute(
+            "SELECT subject, marks FROM student WHERE id = %s FOR UPDATE",
+            (student_id,),
+        )
+        old = cursor.fetchone()
+        if old is None:
+            conn.rollback()
             st.error(f"❌ Student ID {student_id} not found in database!")
             return
 
-        allowed_fields = {
-            "Name": "name",
-            "Age": "age",
-            "Subject": "subject",
-            "Marks": "marks",
-        }
-        if field not in allowed_fields:
+        if field not in UPDATE_FIELDS:
+            conn.rollback()
             st.error("❌ Invalid field selected!")
             return
 
-        column = allowed_fields[field]
+        column = UPDATE_FIELDS[field]
         query = f"UPDATE student SET {column} = %s WHERE id = %s"
         cursor.execute(query, (new_value, student_id))
+        if field in ("Subject", "Marks"):
+            old_subject, old_marks = old
+            new_subject = new_value if field == "Subject" else old_subject
+            new_marks = new_value if field == "Marks" else old_marks
+            remove_from_subject_stats(student_id, old_subject, old_marks)
+            add_to_subject_stats(student_id, new_subject, new_marks)
         conn.commit()
+        bump_data_version()
         st.success(f"✅ {field} updated for Student ID {student_id}!")
+    except pymysql.err.IntegrityError as e:
+        conn.rollback()
+        # 1062: the new value collides with the UNIQUE(name, age, subject) index
+        if e.args[0] == 1062:
+            st.warning("⚠️ Student with same name, age, and subject already exists!")
+        else:
+            st.error(f"❌ Error updating student: {e}")
     except Exception as e:
+        conn.rollback()
         st.error(f"❌ Error updating student: {e}")
 
 
 def delete_student(student_id):
     try:
         # Check if student exists
-        cursor.execute("SELECT id FROM student WHERE id = %s", (student_id,))
-        if cursor.fetchone() is None:
+        cursor.execute(
+            "SELECT subject, marks FROM student WHERE id = %s FOR UPDATE",
+            (student_id,),
+        )
+        old = cursor.fetchone()
+        if old is None:
+            conn.rollback()
             st.error(f"❌ Student ID {student_id} not found in database!")
             return
 
         cursor.execute("DELETE FROM student WHERE id = %s", (student_id,))
+        remove_from_subject_stats(student_id, *old)
         conn.commit()
+        bump_data_version()
         st.success(f"✅ Student ID {student_id} deleted successfully!")
     except Exception as e:
+        conn.rollback()
         st.error(f"❌ Error deleting student: {e}")
 
 
-def get_pass_fail_status(marks, pass_marks=40):
+MAX_BULK_IDS = 10000
+
+
+def parse_student_ids(text):
+    ids = set()
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        start, sep, end = part.partition("-")
+        if not start.isdigit() or (sep and not end.isdigit()):
+            raise ValueError(f"Invalid student ID or range: {part}")
+        start, end = int(start), int(end) if sep else int(start)
+        if start > end:
+            raise ValueError(f"Invalid student ID range: {part}")
+        # Checked before expanding, so a huge range is never materialised
+        if end - start + 1 + len(ids) > MAX_BULK_IDS:
+            raise ValueError(f"At most {MAX_BULK_IDS} student IDs per operation")
+        ids.update(range(start, end + 1))
+    return sorted(ids)
+
+
+def student_selection(ids=None, subject=None):
+    if ids is not None:
+        placeholders = ", ".join(["%s"] * len(ids))
+        return f"id IN ({placeholders})", list(ids)
+    return "subject = %s", [subject]
+
+
+def lock_selected_students(ids=None, subject=None):
+    # One batched lookup locks the matched rows and tells us which IDs are missing
+    where, params = student_selection(ids, subject)
+    cursor.execute(f"SELECT id, subject FROM student WHERE {where} FOR UPDATE", params)
+    rows = cursor.fetchall()
+    found = [row[0] for row in rows]
+    missing = sorted(set(ids) - set(found)) if ids is not None else []
+    return where, params, rows, found, missing
+
+
+def bulk_update_students(field, new_value, ids=None, subject=None):
+    if field not in UPDATE_FIELDS:
+        st.error("❌ Invalid field selected!")
+        return None
+    if ids is not None and not ids:
+        st.warning("⚠️ No student IDs given!")
+        return None
+    try:
+        where, params, rows, found, missing = lock_selected_students(ids, subject)
+        if found:
+            column = UPDATE_FIELDS[field]
+            cursor.execute(
+                f"UPDATE student SET {column} = %s WHERE {where}", [new_value] + params
+            )
+            if field in ("Subject", "Marks"):
+                subjects = {row[1] for row in rows}
+                if field == "Subject":
+                    subjects.add(new_value)
+                rebuild_subject_stats(subjects)
+        conn.commit()
+        if found:
+            bump_data_version()
+            st.success(f"✅ {field} updated for {len(found)} student(s)!")
+        return {"affected": found, "missing": missing}
+    except pymysql.err.IntegrityError as e:
+        conn.rollback()
+        if e.args[0] == 1062:
+            st.warning("⚠️ Student with same name, age, and subject already exists!")
+        else:
+            st.error(f"❌ Error updating students: {e}")
+        return None
+    except Exception as e:
+        conn.rollback()
+        st.error(f"❌ Error updating students: {e}")
+        return None
+
+
+def bulk_delete_students(ids=None, subject=None):
+    if ids is not None and not ids:
+        st.warning("⚠️ No student IDs given!")
+        return None
+    try:
+        where, params, rows, found, missing = lock_selected_students(ids, subject)
+        if found:
+            cursor.execute(f"DELETE FROM student WHERE {where}", params)
+            rebuild_subject_stats({row[1] for row in rows})
+        conn.commit()
+        if found:
+            bump_data_version()
+            st.success(f"✅ {len(found)} student(s) deleted successfully!")
+        return {"affected": found, "missing": missing}
+    except Exception as e:
+        conn.rollback()
+        st.error(f"❌ Error deleting students: {e}")
+        return None
+
+
+def get_pass_fail_status(marks, pass_marks=PASS_MARKS):
     return "PASS" if marks >= pass_marks else "FAIL"
 
 
-def calculate_statistics():
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_statistics(version, pass_marks):
+    # Per-subject aggregates; overall figures are folded from these rows.
+    # The default pass mark reads the maintained subject_stats summary.
+    fresh_snapshot()
+    if pass_marks == PASS_MARKS:
+        cursor.execute(
+            "SELECT subject, student_count, marked_count, marks_sum, pass_count "
+            "FROM subject_stats ORDER BY subject"
+        )
+    else:
+        cursor.execute(
+            "SELECT subject, COUNT(*), COUNT(marks), SUM(marks), SUM(marks >= %s) "
+            "FROM student GROUP BY subject ORDER BY subject",
+            (pass_marks,),
+        )
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    total = sum(int(row[1]) for row in rows)
+    marked = sum(int(row[2]) for row in rows)
+    total_marks = sum(float(row[3] or 0) for row in rows)
+    pass_count = sum(int(row[4] or 0) for row in rows)
+    fail_count = total - pass_count
+    avg_marks = total_marks / marked if marked > 0 else 0
+    pass_percentage = (pass_count / total) * 100 if total > 0 else 0
+    avg_by_subject = pd.Series(
+        [float(row[3]) / int(row[2]) if row[2] else None for row in rows],
+        index=pd.Index([row[0] for row in rows], name="Subject"),
+        name="Marks",
+    )
+
+    cursor.execute(
+        "SELECT id, name, age, subject, marks FROM student WHERE id = ("
+        "SELECT top_student_id FROM subject_stats "
+        "ORDER BY max_marks DESC, top_student_id LIMIT 1)"
+    )
+    top = cursor.fetchone()
+    top_scorer = (
+        pd.Series(top, index=["ID", "Name", "Age", "Subject", "Marks"]) if top else None
+    )
+
+    return {
+        "total": total,
+        "avg_marks": avg_marks,
+        "pass_count": pass_count,
+        "fail_count": fail_count,
+        "pass_percentage": pass_percentage,
+        "top_scorer": top_scorer,
+        "avg_by_subject": avg_by_subject,
+    }
+
+
+def calculate_statistics(pass_marks=PASS_MARKS):
     try:
-        df = get_all_students()
-        if df is None or df.empty:
+        stats = load_statistics(data_version(), pass_marks)
+        if stats is None:
             st.warning("⚠️ No student data available!")
-            return None
-
-        # Add Pass/Fail column
-        df["Status"] = df["Marks"].apply(get_pass_fail_status)
-
-        # Calculate statistics
-        avg_marks = df["Marks"].mean()
-        pass_count = len(df[df["Status"] == "PASS"])
-        fail_count = len(df[df["Status"] == "FAIL"])
-        pass_percentage = (pass_count / len(df)) * 100 if len(df) > 0 else 0
-        top_scorer = df.loc[df["Marks"].idxmax()] if not df.empty else None
-        avg_by_subject = df.groupby("Subject")["Marks"].mean()
-
-        return {
-            "df": df,
-            "avg_marks": avg_marks,
-            "pass_count": pass_count,
-            "fail_count": fail_count,
-            "pass_percentage": pass_percentage,
-            "top_scorer": top_scorer,
-            "avg_by_subject": avg_by_subject,
-        }
+        return stats
     except Exception as e:
         st.error(f"Error calculating statistics: {e}")
         return None
 
 
+def add_pass_fail_status(df, pass_marks=PASS_MARKS):
+    df["Status"] = df["Marks"].ge(pass_marks).map({True: "PASS", False: "FAIL"})
+    return df
+
+
+STREAM_CHUNK_SIZE = 10000
+MARK_VALUES = np.arange(101)
+PERCENTILES = [25, 50, 75, 90]
+
+
+def summarize_marks(counts):
+    # `counts[m]` is the number of students with `m` marks: a mergeable, exact
+    # sketch for 0-100 marks from which every statistic below is derived.
+    total = int(counts.sum())
+    mean = float((counts * MARK_VALUES).sum() / total)
+    variance = float((counts * (MARK_VALUES - mean) ** 2).sum() / total)
+    cumulative = np.cumsum(counts)
+    ranks = np.maximum(np.ceil(np.array(PERCENTILES) / 100 * total), 1)
+    percentiles = np.searchsorted(cumulative, ranks)
+    summary = {"Count": total, "Mean": mean, "Std Dev": variance**0.5}
+    for p, value in zip(PERCENTILES, percentiles):
+        summary["Median" if p == 50 else f"P{p}"] = int(value)
+    return summary
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_marks_distribution(version, chunk_size=STREAM_CHUNK_SIZE):
+    # Stream the table through a server-side cursor and fold each chunk into
+    # per-subject mark counts, so memory stays constant as the table grows.
+    fresh_snapshot()
+    subject_codes = {}
+    counts = np.zeros((0, 101), dtype=np.int64)
+    stream = conn.cursor(pymysql.cursors.SSCursor)
+    try:
+        stream.execute(
+            "SELECT subject, marks FROM student "
+            "WHERE subject IS NOT NULL AND marks IS NOT NULL"
+        )
+        while True:
+            rows = stream.fetchmany(chunk_size)
+            if not rows:
+                break
+            subjects, marks = zip(*rows)
+            names, inverse = np.unique(
+                np.array(subjects, dtype=object), return_inverse=True
+            )
+            codes = np.array(
+                [subject_codes.setdefault(name, len(subject_codes)) for name in names]
+            )
+            if len(subject_codes) > len(counts):
+                counts = np.vstack(
+                    [
+                        counts,
+                        np.zeros(
+                            (len(subject_codes) - len(counts), 101), dtype=np.int64
+                        ),
+                    ]
+                )
+            marks = np.clip(np.fromiter(marks, dtype=np.int64, count=len(rows)), 0, 100)
+            flat = codes[inverse] * 101 + marks
+            counts += np.bincount(flat, minlength=counts.size).reshape(counts.shape)
+    finally:
+        stream.close()
+    if not subject_codes:
+        return None
+
+    overall = counts.sum(axis=0)
+    buckets = overall[:100].reshape(10, 10).sum(axis=1)
+    buckets[-1] += overall[100]
+    histogram = pd.Series(
+        buckets,
+        index=[f"{low}-{low + 9}" for low in range(0, 90, 10)] + ["90-100"],
+        name="Students",
+    )
+    by_subject = pd.DataFrame(
+        [summarize_marks(counts[code]) for code in subject_codes.values()],
+        index=pd.Index(list(subject_codes), name="Subject"),
+    ).sort_index()
+    return {
+        "overall": summarize_marks(overall),
+        "histogram": histogram,
+        "by_subject": by_subject,
+    }
+
+
+def calculate_marks_distribution():
+    try:
+        return load_marks_distribution(data_version())
+    except Exception as e:
+        st.error(f"Error calculating marks distribution: {e}")
+        return None
+
+
+def figure_to_png(fig):
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format="png", bbox_inches="tight")
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+# Charts are rendered to PNG bytes and cached on the data version. matplotlib
+# is imported on first render, and the Figure API keeps figures out of
+# pyplot's global registry so they are freed once rendered.
+@st.cache_data(show_spinner=False, max_entries=16)
+def render_subject_chart(version, pass_marks):
+    from matplotlib.figure import Figure
+
+    avg_by_subject = load_statistics(version, pass_marks)["avg_by_subject"]
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.bar(avg_by_subject.index.astype(str), avg_by_subject.fillna(0), color="skyblue")
+    ax.set_title("Average Marks per Subject", fontsize=14, fontweight="bold")
+    ax.set_xlabel("Subject", fontsize=12)
+    ax.set_ylabel("Average Marks", fontsize=12)
+    ax.set_ylim(0, 100)
+    ax.tick_params(axis="x", labelrotation=45)
+    return figure_to_png(fig)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def render_pass_fail_chart(version, pass_marks):
+    from matplotlib.figure import Figure
+
+    stats = load_statistics(version, pass_marks)
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    sizes = [stats["pass_count"], stats["fail_count"]]
+    labels = [f"PASS ({stats['pass_count']})", f"FAIL ({stats['fail_count']})"]
+    colors = ["#90EE90", "#FFB6C6"]
+    ax.pie(sizes, labels=labels, autopct="%1.1f%%", colors=colors, startangle=90)
+    ax.set_title("Pass/Fail Ratio", fontsize=14, fontweight="bold")
+    return figure_to_png(fig)
+
+
+def select_students(key):
+    target = st.radio(
+        "Select Students By",
+        ["Student IDs", "Subject"],
+        horizontal=True,
+        key=f"{key}_target",
+    )
+    if target == "Student IDs":
+        text = st.text_input(
+            "Student IDs", placeholder="e.g. 1, 4, 10-20", key=f"{key}_ids"
+        )
+        try:
+            return parse_student_ids(text), None
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return [], None
+    subject = st.selectbox("Subject", get_subjects(), key=f"{key}_subject_filter")
+    return None, subject
+
+
+def show_bulk_result(result):
+    if result and result["missing"]:
+        missing = ", ".join(str(student_id) for student_id in result["missing"][:50])
+        more = len(result["missing"]) - 50
+        st.warning(
+            f"⚠️ {len(result['missing'])} ID(s) not found: {missing}"
+            + (f" and {more} more" if more > 0 else "")
+        )
+    elif result is not None and not result["affected"]:
+        st.info("No matching students.")
+
+
+def show_student_pages(key):
+    col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 1, 1])
+    with col1:
+        subject = st.selectbox(
+            "Filter by Subject", ["All"] + get_subjects(), key=f"{key}_subject"
+        )
+        subject = None if subject == "All" else subject
+    with col2:
+        name = st.text_input("Name starts with", key=f"{key}_name").strip()
+    with col3:
+        sort_by = st.selectbox("Sort by", list(SORT_COLUMNS), key=f"{key}_sort")
+    with col4:
+        descending = st.checkbox("Descending", key=f"{key}_desc")
+    with col5:
+        page_size = st.selectbox("Page size", PAGE_SIZES, index=1, key=f"{key}_size")
+
+    # Stack of keyset cursors, one per page visited; reset when the view changes
+    view = (subject, name, sort_by, descending, page_size)
+    if st.session_state.get(f"{key}_view") != view:
+        st.session_state[f"{key}_view"] = view
+        st.session_state[f"{key}_pages"] = [None]
+    pages = st.session_state[f"{key}_pages"]
+
+    total = count_students(subject, name)
+    df, next_key = get_students_page(
+        pages[-1], page_size, sort_by, descending, subject, name
+    )
+    add_pass_fail_status(df)
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    page_count = max(1, -(-total // page_size))
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Previous", key=f"{key}_prev", disabled=len(pages) == 1):
+            pages.pop()
+            st.rerun()
+    with col2:
+        st.write(f"Page {len(pages)} of {page_count} — {total} matching students")
+    with col3:
+        if st.button("Next ➡️", key=f"{key}_next", disabled=next_key is None):
+            pages.append(next_key)
+            st.rerun()
+    return total
+
+
 # ==================== STREAMLIT UI ====================
 
 st.set_page_config(page_title="Student Performance Manager", layout="wide")
@@ -131,6 +852,7 @@ menu = st.sidebar.radio(
         "📊 View All Students",
         "✏️ Update Marks",
         "🗑️ Delete Student",
+        "📥 Bulk Import",
         "📈 Analytics & Visualization",
     ],
 )
@@ -159,24 +881,26 @@ if menu == "➕ Add Student":
 # ==================== VIEW ALL STUDENTS ====================
 elif menu == "📊 View All Students":
     st.header("All Students")
-    df = get_all_students()
-    if df is not None and not df.empty:
-        # Add Pass/Fail status
-        df["Status"] = df["Marks"].apply(get_pass_fail_status)
-        st.table(df)
-
-        st.info(f"📊 Total Students: {len(df)}")
+    total = count_students()
+    if total > 0:
+        show_student_pages("view")
+        st.info(f"📊 Total Students: {total}")
     else:
         st.info("No students in the database yet.")
 
 # ==================== UPDATE MARKS ====================
 elif menu == "✏️ Update Marks":
     st.header("Update Student Marks")
-    df = get_all_students()
-    if df is not None and not df.empty:
+    if count_students() > 0:
+        mode = st.radio(
+            "Update", ["Single Student", "Multiple Students"], horizontal=True
+        )
         col1, col2 = st.columns(2)
         with col1:
-            student_id = st.number_input("Enter Student ID to Update", min_value=1)
+            if mode == "Single Student":
+                student_id = st.number_input("Enter Student ID to Update", min_value=1)
+            else:
+                ids, subject = select_students("update")
         with col2:
             field_to_update = st.selectbox(
                 "Select Field to Update", ["Name", "Age", "Subject", "Marks"]
@@ -198,28 +922,78 @@ elif menu == "✏️ Update Marks":
         if st.button("🔄 Update Student"):
             if field_to_update in ["Name", "Subject"] and not str(new_value).strip():
                 st.error("Please enter a valid value!")
-            else:
+            elif mode == "Single Student":
                 update_student_field(student_id, field_to_update, new_value)
+            else:
+                show_bulk_result(
+                    bulk_update_students(field_to_update, new_value, ids, subject)
+                )
     else:
         st.info("No students in the database yet.")
 
 # ==================== DELETE STUDENT ====================
 elif menu == "🗑️ Delete Student":
     st.header("Delete Student Record")
-    df = get_all_students()
-    if df is not None and not df.empty:
-        st.table(df)
-        student_id = st.number_input("Enter Student ID to Delete", min_value=1)
-        if st.button("🗑️ Delete Student", type="secondary"):
-            delete_student(student_id)
+    if count_students() > 0:
+        show_student_pages("delete")
+        mode = st.radio(
+            "Delete", ["Single Student", "Multiple Students"], horizontal=True
+        )
+        if mode == "Single Student":
+            student_id = st.number_input("Enter Student ID to Delete", min_value=1)
+            if st.button("🗑️ Delete Student", type="secondary"):
+                delete_student(student_id)
+        else:
+            ids, subject = select_students("delete")
+            if st.button("🗑️ Delete Students", type="secondary"):
+                show_bulk_result(bulk_delete_students(ids, subject))
     else:
         st.info("No students in the database yet.")
 
+# ==================== BULK IMPORT ====================
+elif menu == "📥 Bulk Import":
+    st.header("Bulk Import Students")
+    st.write("Upload a CSV or Parquet file with columns: name, age, subject, marks")
+    uploaded = st.file_uploader("Student File", type=["csv", "parquet"])
+    on_duplicate = st.radio(
+        "Existing students (same name, age and subject)",
+        list(IMPORT_QUERIES),
+        horizontal=True,
+    )
+    if uploaded is not None and st.button("📥 Import Students"):
+        with st.spinner("Importing..."):
+            report = import_students(uploaded, uploaded.name, on_duplicate)
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("Rows Read", report["read"])
+        if on_duplicate == "Skip":
+            col2.metric("Inserted", report["inserted"])
+            col3.metric("Duplicates Skipped", report["duplicates"])
+        else:
+            col2.metric("Inserted or Updated", report["written"])
+            col3.metric(
+                "Rows Affected",
+                report["affected"],
+                help="MySQL counts 1 per insert, 2 per changed row and 0 per unchanged row.",
+            )
+        col4.metric("Rejected", len(report["rejected"]))
+        col5.metric("Rows/sec", f"{report['rows_per_sec']:,.0f}")
+        if not report["rejected"].empty:
+            st.subheader("❌ Rejected Rows")
+            st.dataframe(report["rejected"], use_container_width=True)
+            st.download_button(
+                "Download Rejected Rows",
+                report["rejected"].to_csv(),
+                file_name="rejected_students.csv",
+            )
+
 # ==================== ANALYTICS & VISUALIZATION ====================
 elif menu == "📈 Analytics & Visualization":
     st.header("Analytics & Visualization")
 
-    stats = calculate_statistics()
+    pass_marks = st.number_input(
+        "Pass Mark", min_value=0, max_value=100, value=PASS_MARKS
+    )
+    stats = calculate_statistics(pass_marks)
     if stats:
         # Display Top Scorer
         st.subheader("🏆 Top Scorer")
@@ -252,31 +1026,45 @@ elif menu == "📈 Analytics & Visualization":
         with col1:
             # Bar Chart: Subject vs Average Marks
             st.write("**Bar Chart: Subject vs Average Marks**")
-            fig, ax = plt.subplots(figsize=(10, 5))
-            stats["avg_by_subject"].plot(kind="bar", ax=ax, color="skyblue")
-            ax.set_title("Average Marks per Subject", fontsize=14, fontweight="bold")
-            ax.set_xlabel("Subject", fontsize=12)
-            ax.set_ylabel("Average Marks", fontsize=12)
-            ax.set_ylim(0, 100)
-            plt.xticks(rotation=45)
-            st.pyplot(fig)
+            st.image(render_subject_chart(data_version(), pass_marks))
 
         with col2:
             # Pie Chart: Pass/Fail Ratio
             st.write("**Pie Chart: Pass/Fail Ratio**")
-            fig, ax = plt.subplots(figsize=(8, 6))
-            sizes = [stats["pass_count"], stats["fail_count"]]
-            labels = [f"PASS ({stats['pass_count']})", f"FAIL ({stats['fail_count']})"]
-            colors = ["#90EE90", "#FFB6C6"]
-            ax.pie(
-                sizes, labels=labels, autopct="%1.1f%%", colors=colors, startangle=90
-            )
-            ax.set_title("Pass/Fail Ratio", fontsize=14, fontweight="bold")
-            st.pyplot(fig)
+            st.image(render_pass_fail_chart(data_version(), pass_marks))
 
-        # Show detailed Pass/Fail table
+        # Marks distribution streamed from the student table
+        st.subheader("📊 Marks Distribution")
+        distribution = calculate_marks_distribution()
+        if distribution:
+            overall = distribution["overall"]
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Mean", f"{overall['Mean']:.2f}")
+            col2.metric("Std Dev", f"{overall['Std Dev']:.2f}")
+            col3.metric("Median", overall["Median"])
+            col4.metric("90th Percentile", overall["P90"])
+            col1, col2 = st.columns(2)
+            with col1:
+                st.bar_chart(distribution["histogram"])
+            with col2:
+                st.dataframe(
+                    distribution["by_subject"].round(2), use_container_width=True
+                )
+
+        # Show detailed Pass/Fail table (only fetched on demand)
         st.subheader("📋 Student Pass/Fail Status")
-        st.dataframe(
-            stats["df"][["ID", "Name", "Subject", "Marks", "Status"]],
-            use_container_width=True,
+        if st.checkbox(f"Show all {stats['total']} students"):
+            df = get_all_students()
+            if df is not None and not df.empty:
+                add_pass_fail_status(df, pass_marks)
+                st.dataframe(
+                    df[["ID", "Name", "Subject", "Marks", "Status"]],
+                    use_container_width=True,
+                )
+
+    with st.expander("🔧 Maintenance"):
+        st.write(
+            "Rebuild the subject summary if it has drifted from the student table."
         )
+        if st.button("Rebuild Subject Statistics"):
+            repair_subject_stats()
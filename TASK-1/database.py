@@ -8,4 +8,51 @@ conn=pymysql.connect(
 )
 cursor=conn.cursor()
 cursor.execute("Create table if not exists student(id int AUTO_INCREMENT primary key, name varchar(20),age int,subject varchar(20),marks int)")
-conn.commit()
\ No newline at end of file
+
+# Indexes backing the keyset-paginated student grid (sort column + id) and
+# the duplicate check used by single and bulk inserts
+indexes={
+  "idx_student_subject":("INDEX","subject, id"),
+  "idx_student_name":("INDEX","name, id"),
+  "idx_student_age":("INDEX","age, id"),
+  "idx_student_marks":("INDEX","marks, id"),
+  "idx_student_subject_marks":("INDEX","subject, marks, id"),
+  "uq_student_name_age_subject":("UNIQUE INDEX","name, age, subject"),
+}
+for index_name,(kind,columns) in indexes.items():
+  cursor.execute(
+    "SELECT COUNT(*) FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = 'student' AND index_name = %s",
+    (index_name,),
+  )
+  if cursor.fetchone()[0]==0:
+    if kind=="UNIQUE INDEX":
+      # Rows written before the index existed may already collide
+      cursor.execute(
+        f"SELECT {columns}, GROUP_CONCAT(id ORDER BY id) FROM student GROUP BY {columns} HAVING COUNT(*) > 1"
+      )
+      duplicates=cursor.fetchall()
+      if duplicates:
+        print(f"Cannot add {index_name}: resolve these duplicate students and re-run")
+        for *key,ids in duplicates:
+          print(f"  {key}: IDs {ids}")
+        continue
+    cursor.execute(f"ALTER TABLE student ADD {kind} {index_name}({columns})")
+
+# Per-subject summary maintained by the app on every write (pass mark 40)
+cursor.execute("Create table if not exists subject_stats(subject varchar(20) primary key, student_count int not null default 0, marked_count int not null default 0, marks_sum bigint not null default 0, pass_count int not null default 0, max_marks int, top_student_id int)")
+# Tables created before marked_count existed get the column and a rebuild
+cursor.execute(
+  "SELECT COUNT(*) FROM information_schema.columns WHERE table_schema = DATABASE() AND table_name = 'subject_stats' AND column_name = 'marked_count'"
+)
+if cursor.fetchone()[0]==0:
+  cursor.execute("ALTER TABLE subject_stats ADD marked_count int not null default 0 AFTER student_count")
+  cursor.execute("DELETE FROM subject_stats")
+cursor.execute("SELECT COUNT(*) FROM subject_stats")
+if cursor.fetchone()[0]==0:
+  cursor.execute(
+    "INSERT INTO subject_stats(subject, student_count, marked_count, marks_sum, pass_count, max_marks, top_student_id) "
+    "SELECT s.subject, COUNT(*), COUNT(s.marks), COALESCE(SUM(s.marks), 0), COALESCE(SUM(s.marks >= 40), 0), MAX(s.marks), "
+    "(SELECT t.id FROM student t WHERE t.subject = s.subject ORDER BY t.marks DESC, t.id LIMIT 1) "
+    "FROM student s WHERE s.subject IS NOT NULL GROUP BY s.subject"
+  )
+conn.commit()
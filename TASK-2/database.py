@@ -48,10 +48,46 @@ CREATE TABLE IF NOT EXISTS marks (
 )
 """)
 
+# Create daily per-class attendance rollup, maintained by the attendance save path
+cursor.execute("""
+CREATE TABLE IF NOT EXISTS daily_class_attendance (
+    class VARCHAR(50) NOT NULL,
+    date DATE NOT NULL,
+    present INT NOT NULL DEFAULT 0,
+    absent INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (class, date),
+    KEY idx_daily_class_attendance_date (date)
+)
+""")
+cursor.execute("SELECT COUNT(*) FROM daily_class_attendance")
+if cursor.fetchone()[0] == 0:
+    # Backfill from existing attendance
+    cursor.execute("""
+    INSERT INTO daily_class_attendance (class, date, present, absent)
+    SELECT s.class, a.date, SUM(a.status = 'Present'), SUM(a.status = 'Absent')
+    FROM attendance a JOIN students s ON s.id = a.student_id
+    GROUP BY s.class, a.date
+    """)
+
+# Supporting indexes for the class/date-range attendance queries
+indexes = {
+    "attendance": {"idx_attendance_date_student": "date, student_id"},
+    "students": {"idx_students_class_roll": "class, roll_no"},
+}
+for table, table_indexes in indexes.items():
+    for index_name, columns in table_indexes.items():
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.statistics WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+            (table, index_name),
+        )
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"CREATE INDEX {index_name} ON {table} ({columns})")
+
 conn.commit()
 print("Tables created successfully!")
 print("\nTable Structure:")
 print("1. students - Stores student information")
 print("2. attendance - Tracks daily attendance (Present/Absent)")
 print("3. marks - Stores subject-wise marks with pass/fail status")
+print("4. daily_class_attendance - Per-class daily Present/Absent rollup")
 conn.close()
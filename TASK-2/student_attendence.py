@@ -1,27 +1,110 @@
+import datetime as dt
+import io
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
+import numpy as np
 import pymysql
 
 st.set_page_config(page_title="Student Attendance & Marks Portal", layout="wide", initial_sidebar_state="expanded")
 CLASSES = ["AI", "DS", "CSE"]
 SUBJECTS = ["Math", "English", "Science", "History", "Geography"]
+DB_CONFIG = {"host": "localhost", "user": "root", "password": "Sql@3117", "database": "task_db"}
+POOL_SIZE, POOL_TIMEOUT, POOL_IDLE_SECONDS = 10, 5, 300
+ROSTER_SEARCH_LIMIT = 200
+REPORT_WORKERS = 2
+ATTENDANCE_THRESHOLD = 75
+MARKS_IMPORT_COLUMNS = ["roll_no", "subject", "marks"]
+EXPORT_CHUNK_SIZE, EXPORT_DIR = 5000, "exports"
+EXPORTS = {
+    "Attendance": ("SELECT s.roll_no, s.name, s.class, a.date, a.status FROM attendance a JOIN students s ON s.id = a.student_id "
+                   "WHERE s.class = %s AND a.date >= %s AND a.date < %s ORDER BY a.date, s.roll_no", ["Roll No", "Name", "Class", "Date", "Status"]),
+    "Marks": ("SELECT s.roll_no, s.name, s.class, m.subject, m.marks, m.pass_marks, m.status, m.date_created FROM marks m JOIN students s ON s.id = m.student_id "
+              "WHERE s.class = %s AND m.date_created >= %s AND m.date_created < %s ORDER BY s.roll_no, m.subject", ["Roll No", "Name", "Class", "Subject", "Marks", "Pass Marks", "Status", "Date Created"]),
+}
+
+class ConnectionPool:
+    # Thread-safe pool: at most `size` connections are borrowed at once, borrowers wait up to
+    # `timeout` seconds, idle connections are pinged before reuse and closed after `idle_seconds`.
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT, idle_seconds=POOL_IDLE_SECONDS, **config):
+        self.size, self.timeout, self.idle_seconds, self.config = size, timeout, idle_seconds, config
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.idle = deque()
+
+    def acquire(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No database connection free after {self.timeout}s")
+        try:
+            while True:
+                with self.lock:
+                    self.evict_idle()
+                    # Most recently used first, so the oldest connections age out
+                    conn = self.idle.pop()[0] if self.idle else None
+                if conn is None:
+                    return pymysql.connect(**self.config)
+                try:
+                    conn.ping(reconnect=False)
+                    return conn
+                except Exception:
+                    self.close_quietly(conn)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, conn):
+        try:
+            # Drop any open transaction; a connection that cannot do that is discarded
+            conn.rollback()
+            with self.lock:
+                self.idle.append((conn, time.monotonic()))
+        except Exception:
+            self.close_quietly(conn)
+        finally:
+            self.slots.release()
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        while self.idle and self.idle[0][1] < cutoff:
+            self.close_quietly(self.idle.popleft()[0])
+
+    @staticmethod
+    def close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+@st.cache_resource
+def get_pool():
+    return ConnectionPool(**DB_CONFIG)
 
 def get_connection():
     try:
-        return pymysql.connect(host="localhost", user="root", password="Sql@3117", database="task_db")
+        return get_pool().acquire()
     except Exception as e:
         st.error(f"Database connection error: {e}")
         return None
 
+def release_connection(conn):
+    get_pool().release(conn)
+
 def execute_query(query, params=()):
     conn = get_connection()
     if not conn : 
         return None
-    cursor = conn.cursor()
-    cursor.execute(query, params)
-    result = cursor.fetchall()
-    conn.close()
-    return result
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        release_connection(conn)
 
 def execute_update(query, params=()):
     conn = get_connection()
@@ -36,7 +119,125 @@ def execute_update(query, params=()):
         st.error(f"Error: {e}")
         return False
     finally:
-        conn.close()
+        release_connection(conn)
+
+def execute_transaction(steps):
+    conn = get_connection()
+    if not conn : 
+        return False
+    cursor = conn.cursor()
+    try:
+        for query, params in steps:
+            cursor.execute(query, params)
+        conn.commit()
+        return True
+    except Exception as e:
+        conn.rollback()
+        st.error(f"Error: {e}")
+        return False
+    finally:
+        release_connection(conn)
+
+def save_attendance(class_name, attendance_date, changes):
+    # Upsert the changed rows and apply their Present/Absent deltas to the daily rollup in one
+    # transaction; previous statuses are read under lock so concurrent saves cannot skew it
+    conn = get_connection()
+    if not conn : 
+        return False
+    cursor = conn.cursor()
+    try:
+        student_ids = [student_id for student_id, _ in changes]
+        placeholders = ", ".join(["%s"] * len(student_ids))
+        cursor.execute(f"SELECT student_id, status FROM attendance WHERE date = %s AND student_id IN ({placeholders}) FOR UPDATE", [attendance_date] + student_ids)
+        previous = dict(cursor.fetchall())
+        cursor.executemany("INSERT INTO attendance (student_id, date, status) VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE status = VALUES(status)", 
+                           [(student_id, attendance_date, status) for student_id, status in changes])
+        delta = {"Present": 0, "Absent": 0}
+        for student_id, status in changes:
+            if previous.get(student_id) != status:
+                delta[status] += 1
+                if student_id in previous:
+                    delta[previous[student_id]] -= 1
+        cursor.execute("INSERT INTO daily_class_attendance (class, date, present, absent) VALUES (%s, %s, %s, %s) ON DUPLICATE KEY UPDATE present = present + VALUES(present), absent = absent + VALUES(absent)", 
+                       (class_name, attendance_date, delta["Present"], delta["Absent"]))
+        conn.commit()
+        return True
+    except Exception as e:
+        conn.rollback()
+        st.error(f"Error: {e}")
+        return False
+    finally:
+        release_connection(conn)
+
+def rebuild_daily_rollup(start_date, end_date):
+    return execute_transaction([
+        ("DELETE FROM daily_class_attendance WHERE date BETWEEN %s AND %s", (start_date, end_date)),
+        ("INSERT INTO daily_class_attendance (class, date, present, absent) SELECT s.class, a.date, SUM(a.status = 'Present'), SUM(a.status = 'Absent') "
+         "FROM attendance a JOIN students s ON s.id = a.student_id WHERE a.date BETWEEN %s AND %s GROUP BY s.class, a.date", (start_date, end_date)),
+    ])
+
+class Roster:
+    # Immutable snapshot of (id, roll_no, name) rows in roll number order, with an id index and
+    # sorted roll number / name keys for prefix search by bisection.
+    def __init__(self, students):
+        self.students = students
+        self.by_id = {student[0]: student for student in students}
+        self.by_roll = sorted((str(roll_no), student_id) for student_id, roll_no, name in students)
+        self.by_name = sorted((name.lower(), student_id) for student_id, roll_no, name in students)
+
+    def label(self, student_id):
+        student_id, roll_no, name = self.by_id[student_id]
+        return f"{roll_no} - {name}"
+
+    def search(self, prefix="", limit=ROSTER_SEARCH_LIMIT):
+        if not prefix:
+            return self.students[:limit]
+        prefix = prefix.lower()
+        keys = self.by_roll if prefix.isdigit() else self.by_name
+        matches = []
+        for key, student_id in keys[bisect_left(keys, (prefix,)):]:
+            if not key.startswith(prefix) or len(matches) == limit:
+                break
+            matches.append(self.by_id[student_id])
+        return matches
+
+@st.cache_resource
+def get_roster_cache():
+    return {"lock": threading.Lock(), "rosters": {}}
+
+def get_roster(class_name=None):
+    # One students query per process fills the global roster; class rosters are sliced from it
+    cache = get_roster_cache()
+    with cache["lock"]:
+        rosters = cache["rosters"]
+        if None not in rosters:
+            rows = execute_query("SELECT id, roll_no, name, class FROM students ORDER BY roll_no")
+            if rows is None:
+                return Roster([])
+            rosters[None] = Roster([(student_id, roll_no, name) for student_id, roll_no, name, _ in rows])
+            for roster_class in CLASSES:
+                rosters[roster_class] = Roster([(student_id, roll_no, name) for student_id, roll_no, name, row_class in rows if row_class == roster_class])
+        return rosters.get(class_name) or Roster([])
+
+def invalidate_roster():
+    cache = get_roster_cache()
+    with cache["lock"]:
+        cache["rosters"].clear()
+
+def select_student(key, class_name=None):
+    roster = get_roster(class_name)
+    if not roster.students:
+        st.info("No students found.")
+        return None
+    search = st.text_input("Search by Roll No or Name:", key=f"{key}_search").strip()
+    matches = roster.search(search)
+    if not matches:
+        st.info("No students match this search.")
+        return None
+    if len(matches) == ROSTER_SEARCH_LIMIT:
+        st.caption(f"Showing the first {ROSTER_SEARCH_LIMIT} matches — refine the search to narrow the list.")
+    student_id = st.selectbox("Select Student:", [student[0] for student in matches], format_func=roster.label, key=key)
+    return roster.by_id[student_id]
 
 def add_student():
     st.subheader("➕ Add Student")
@@ -46,64 +247,155 @@ def add_student():
             if not name: 
                 st.error("Please enter student name!")
             elif execute_update("INSERT INTO students (roll_no, name, class) VALUES (%s, %s, %s)", (roll_no, name, class_name)):
+                invalidate_roster()
+                bump_marks_version()
                 st.success(f"Student {name} added successfully!")
 
 def mark_attendance():
     st.subheader("📋 Mark Attendance")
-    selected_class = st.selectbox("Select Class:", CLASSES)
-    students = execute_query("SELECT id, roll_no, name FROM students WHERE class = %s ORDER BY roll_no", (selected_class,))
-    if students:
+    selected_class, attendance_date = st.selectbox("Select Class:", CLASSES), st.date_input("Select Date:")
+    # Pre-load any attendance already saved for this date so only changes are written
+    records = execute_query("SELECT s.id, s.roll_no, s.name, a.status FROM students s LEFT JOIN attendance a ON s.id = a.student_id AND a.date = %s WHERE s.class = %s ORDER BY s.roll_no", 
+                            (attendance_date, selected_class))
+    if records:
+        df = pd.DataFrame(records, columns=["ID", "Roll No", "Name", "Saved"])
+        df["Present"] = df["Saved"].fillna("Present").eq("Present")
         with st.form("attendance_form"):
-            attendance_date = st.date_input("Select Date:")
-            attendance_data = []
-            for student_id, roll_no, name in students:
-                col1, col2, col3 = st.columns([1, 2, 2])
-                col1.write(f"**{roll_no}**")
-                col2.write(name)
-                status = col3.radio("Status", ["Present", "Absent"], key=f"attendance_{student_id}", horizontal=True)
-                attendance_data.append((student_id, status))
+            st.caption("Students are marked present by default — untick the absentees.")
+            edited = st.data_editor(df[["Roll No", "Name", "Present"]], disabled=["Roll No", "Name"], hide_index=True, use_container_width=True, 
+                                    key=f"attendance_{selected_class}_{attendance_date}")
             if st.form_submit_button("Save Attendance"):
-                conn = get_connection()
-                if conn:
-                    cursor = conn.cursor()
-                    for student_id, status in attendance_data:
-                        cursor.execute("INSERT INTO attendance (student_id, date, status) VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE status = %s", 
-                                     (student_id, attendance_date, status, status))
-                    conn.commit()
-                    conn.close()
-                    st.success(f"Attendance marked for {len(attendance_data)} students!")
+                status = np.where(edited["Present"].to_numpy(dtype=bool), "Present", "Absent")
+                changed = status != df["Saved"].to_numpy()
+                changes = list(zip(df["ID"][changed].tolist(), status[changed].tolist()))
+                if not changes:
+                    st.info("No attendance changes to save.")
+                elif save_attendance(selected_class, attendance_date, changes):
+                    load_attendance_matrix.clear()
+                    load_daily_rollup.clear()
+                    st.success(f"Attendance saved for {len(df)} students ({len(changes)} updated)!")
     else: 
         st.info(f"No students found in {selected_class} class.")
 
+def read_marks_chunks(file, file_name, chunk_size):
+    if file_name.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+        # read_only mode streams rows from the sheet instead of loading it whole
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    yield pd.DataFrame(chunk, columns=header)
+                    chunk = []
+            if chunk:
+                yield pd.DataFrame(chunk, columns=header)
+        finally:
+            # read_only workbooks keep the file open until closed
+            workbook.close()
+    else:
+        yield from pd.read_csv(file, chunksize=chunk_size)
+
+def lookup_student_ids(cursor, roll_nos):
+    # One indexed lookup per chunk, so students added by any process are known
+    roll_nos = sorted({int(roll_no) for roll_no in roll_nos if roll_no % 1 == 0})
+    if not roll_nos:
+        return {}
+    placeholders = ", ".join(["%s"] * len(roll_nos))
+    cursor.execute(f"SELECT roll_no, id FROM students WHERE roll_no IN ({placeholders})", roll_nos)
+    return dict(cursor.fetchall())
+
+def validate_marks_chunk(chunk, first_row, cursor):
+    chunk = chunk.rename(columns=lambda column: str(column).strip().lower())
+    missing = [column for column in MARKS_IMPORT_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    chunk.index = pd.RangeIndex(first_row, first_row + len(chunk), name="Row")
+    roll_no, marks = pd.to_numeric(chunk["roll_no"], errors="coerce"), pd.to_numeric(chunk["marks"], errors="coerce")
+    subject = chunk["subject"].astype("string").str.strip().str.title()
+    student_id = roll_no.map(lookup_student_ids(cursor, roll_no.dropna()))
+    errors = np.select([(roll_no.isna() | (roll_no % 1 != 0)).to_numpy(dtype=bool), student_id.isna().to_numpy(dtype=bool), 
+                        (~subject.isin(SUBJECTS)).fillna(True).to_numpy(dtype=bool), (~marks.between(0, 100) | (marks % 1 != 0)).to_numpy(dtype=bool)], 
+                       ["Invalid roll number", "Unknown roll number", f"Subject must be one of: {', '.join(SUBJECTS)}", "Marks must be a whole number between 0 and 100"], default="")
+    valid = errors == ""
+    rows = list(zip(student_id[valid].astype(int).tolist(), subject[valid].tolist(), marks[valid].astype(int).tolist()))
+    rejected = chunk.loc[~valid, MARKS_IMPORT_COLUMNS].assign(Error=errors[~valid])
+    return rows, rejected
+
+def import_marks(file, file_name, chunk_size=5000, batch_size=1000):
+    report, rejected_chunks, start = {"read": 0, "upserted": 0}, [], time.perf_counter()
+    conn = get_connection()
+    if not conn : 
+        return None
+    cursor = conn.cursor()
+    try:
+        for chunk in read_marks_chunks(file, file_name, chunk_size):
+            rows, rejected = validate_marks_chunk(chunk, report["read"] + 1, cursor)
+            report["read"] += len(chunk)
+            if not rejected.empty:
+                rejected_chunks.append(rejected)
+            for i in range(0, len(rows), batch_size):
+                cursor.executemany("INSERT INTO marks (student_id, subject, marks) VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE marks = VALUES(marks)", rows[i:i + batch_size])
+            report["upserted"] += len(rows)
+        conn.commit()
+        bump_marks_version()
+    except Exception as e:
+        conn.rollback()
+        st.error(f"Error importing marks: {e}")
+        report["upserted"] = 0
+    finally:
+        release_connection(conn)
+    elapsed = time.perf_counter() - start
+    report["rows_per_sec"] = report["read"] / elapsed if elapsed > 0 else 0
+    report["rejected"] = pd.concat(rejected_chunks) if rejected_chunks else pd.DataFrame()
+    return report
+
+def bulk_import_marks():
+    st.write(f"Upload a CSV or Excel file with columns: {', '.join(MARKS_IMPORT_COLUMNS)}")
+    uploaded = st.file_uploader("Marks File:", type=["csv", "xlsx"])
+    if uploaded is not None and st.button("Import Marks"):
+        with st.spinner("Importing marks..."):
+            report = import_marks(uploaded, uploaded.name)
+        if report:
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Rows Read", report["read"])
+            col2.metric("Marks Saved", report["upserted"])
+            col3.metric("Rejected", len(report["rejected"]))
+            col4.metric("Rows/sec", f"{report['rows_per_sec']:,.0f}")
+            if not report["rejected"].empty:
+                st.dataframe(report["rejected"], use_container_width=True)
+                st.download_button("Download Rejected Rows", report["rejected"].to_csv(), file_name="rejected_marks.csv")
+
 def add_marks():
     st.subheader("📊 Add Marks")
-    students = execute_query("SELECT id, roll_no, name FROM students ORDER BY roll_no")
-    if students:
-        student_dict = {f"{roll_no} - {name}": student_id for student_id, roll_no, name in students}
+    if st.radio("Entry Mode:", ["Single Student", "Bulk Import"], horizontal=True) == "Bulk Import":
+        bulk_import_marks()
+        return
+    student = select_student("add_marks")
+    if student:
+        student_id, roll_no, name = student
         with st.form("add_marks_form"):
-            student_name, subject, marks = st.selectbox("Select Student:", list(student_dict.keys())), st.selectbox("Subject:", SUBJECTS), st.number_input("Marks (0-100):", min_value=0, max_value=100)
+            subject, marks = st.selectbox("Subject:", SUBJECTS), st.number_input("Marks (0-100):", min_value=0, max_value=100)
             if st.form_submit_button("Add Marks"):
-                student_id = student_dict[student_name]
                 if execute_update("INSERT INTO marks (student_id, subject, marks) VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE marks = %s", (student_id, subject, marks, marks)):
-                    st.success(f"Marks added/updated for {student_name}!")
-    else: 
-        st.info("No students found.")
+                    bump_marks_version()
+                    st.success(f"Marks added/updated for {roll_no} - {name}!")
 
 def view_attendance():
     st.subheader("📅 View Attendance")
     view_type = st.radio("View By:", ["Student", "Class"], horizontal=True)
     if view_type == "Student":
-        students = execute_query("SELECT id, roll_no, name FROM students ORDER BY roll_no")
-        if students:
-            student_dict = {f"{roll_no} - {name}": student_id for student_id, roll_no, name in students}
-            student_id = student_dict[st.selectbox("Select Student:", list(student_dict.keys()))]
+        student = select_student("view_attendance")
+        if student:
+            student_id = student[0]
             records = execute_query("SELECT a.date, a.status FROM attendance a WHERE a.student_id = %s ORDER BY a.date DESC", (student_id,))
             if records: 
                 st.dataframe(pd.DataFrame(records, columns=["Date", "Status"]), use_container_width=True)
             else: 
                 st.info("No attendance records found for this student.")
-        else:
-            st.info("No students found.")
     else:
         selected_class, attendance_date = st.selectbox("Select Class:", CLASSES), st.date_input("Select Date:")
         records = execute_query("SELECT s.roll_no, s.name, a.status FROM students s LEFT JOIN attendance a ON s.id = a.student_id AND a.date = %s WHERE s.class = %s ORDER BY s.roll_no", 
@@ -113,12 +405,52 @@ def view_attendance():
         else: 
             st.info("No students found for this class.")
 
+LEADERBOARD_SORTS = {"Attendance % (low → high)": "percentage IS NULL, percentage ASC, s.roll_no", "Attendance % (high → low)": "percentage DESC, s.roll_no", "Roll No": "s.roll_no"}
+
+def attendance_leaderboard(class_name=None, date_range=None, threshold=None, sort_by="Roll No"):
+    # Every student's attendance % from one grouped query; filtering and sorting happen server-side
+    join, where, params = "", "", []
+    if date_range:
+        join = " AND a.date BETWEEN %s AND %s"
+        params.extend(date_range)
+    if class_name:
+        where = " WHERE s.class = %s"
+        params.append(class_name)
+    having = ""
+    if threshold is not None:
+        having = " HAVING percentage < %s"
+        params.append(threshold)
+    return execute_query("SELECT s.roll_no, s.name, s.class, COUNT(CASE WHEN a.status = 'Present' THEN 1 END), COUNT(a.id), 100 * COUNT(CASE WHEN a.status = 'Present' THEN 1 END) / NULLIF(COUNT(a.id), 0) AS percentage "
+                         f"FROM students s LEFT JOIN attendance a ON a.student_id = s.id{join}{where} GROUP BY s.id, s.roll_no, s.name, s.class{having} ORDER BY {LEADERBOARD_SORTS[sort_by]}", params)
+
+def show_attendance_leaderboard():
+    col1, col2, col3 = st.columns(3)
+    selected_class = col1.selectbox("Class:", ["All Classes"] + CLASSES, key="leaderboard_class")
+    sort_by = col2.selectbox("Sort By:", list(LEADERBOARD_SORTS), key="leaderboard_sort")
+    threshold = col3.number_input("Only Below %:", min_value=0, max_value=100, value=ATTENDANCE_THRESHOLD, key="leaderboard_threshold")
+    col1, col2 = st.columns(2)
+    only_below = col1.checkbox(f"Only students below {threshold}%", key="leaderboard_only_below")
+    date_range = col2.date_input("Date Range (optional):", (), key="leaderboard_range")
+    if len(date_range) == 1:
+        st.info("Select an end date, or clear the range to use all dates.")
+        return
+    records = attendance_leaderboard(None if selected_class == "All Classes" else selected_class, date_range or None, threshold if only_below else None, sort_by)
+    if records:
+        df = pd.DataFrame(records, columns=["Roll No", "Name", "Class", "Present Days", "Total Days", "Attendance %"])
+        df["Attendance %"] = pd.to_numeric(df["Attendance %"]).round(2)
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        st.caption(f"{len(df)} students")
+    else:
+        st.info("No students match these filters.")
+
 def calculate_attendance():
     st.subheader("📈 Calculate Attendance")
-    students = execute_query("SELECT id, roll_no, name FROM students ORDER BY roll_no")
-    if students:
-        student_dict = {f"{roll_no} - {name}": (student_id, roll_no, name) for student_id, roll_no, name in students}
-        student_id, roll_no, name = student_dict[st.selectbox("Select Student:", list(student_dict.keys()), key="attendance_calc")]
+    if st.radio("Calculate For:", ["Student", "Class Leaderboard"], horizontal=True) == "Class Leaderboard":
+        show_attendance_leaderboard()
+        return
+    student = select_student("attendance_calc")
+    if student:
+        student_id, roll_no, name = student
         col1, col2 = st.columns(2)
         col1.markdown(f"**Roll No:** {roll_no}")
         col2.markdown(f"**Name:** {name}")
@@ -131,17 +463,95 @@ def calculate_attendance():
             col3.metric("Attendance %", f"{percentage:.2f}%")
         else: 
             st.info("No attendance records found.")
-    else: 
-        st.info("No students found.")
+
+@st.cache_resource
+def get_report_store():
+    # Process-wide background executor plus the latest class reports, keyed on class and tagged
+    # with the marks data version they were computed from
+    return {"executor": ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="class-report"), "lock": threading.Lock(), 
+            "version": 0, "reports": {}, "running": {}}
+
+def marks_version():
+    return get_report_store()["version"]
+
+def bump_marks_version():
+    store = get_report_store()
+    with store["lock"]:
+        store["version"] += 1
+
+def compute_class_report(pool, class_name):
+    conn = pool.acquire()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT s.id, s.roll_no, s.name, AVG(m.marks), COUNT(m.subject), SUM(CASE WHEN m.status = 'Pass' THEN 1 ELSE 0 END) FROM students s LEFT JOIN marks m ON s.id = m.student_id WHERE s.class = %s GROUP BY s.id, s.roll_no, s.name ORDER BY s.roll_no", (class_name,))
+        return pd.DataFrame(cursor.fetchall(), columns=["ID", "Roll No", "Name", "Avg Marks", "Total Subjects", "Passed Subjects"]).drop("ID", axis=1)
+    finally:
+        pool.release(conn)
+
+def request_class_report(class_name, force=False):
+    # Queue a background refresh unless the cached report is current or one is already running
+    store, pool = get_report_store(), get_pool()
+    with store["lock"]:
+        version, cached = store["version"], store["reports"].get(class_name)
+        if class_name in store["running"] or (cached and cached["version"] == version and not force):
+            return
+        store["running"][class_name] = dt.datetime.now()
+
+    def run():
+        try:
+            report = {"data": compute_class_report(pool, class_name), "error": None}
+        except Exception as e:
+            report = {"data": cached["data"] if cached else None, "error": str(e)}
+        report.update(version=version, computed_at=dt.datetime.now())
+        with store["lock"]:
+            store["reports"][class_name] = report
+            store["running"].pop(class_name, None)
+
+    store["executor"].submit(run)
+
+def class_report_status(class_name):
+    store = get_report_store()
+    with store["lock"]:
+        return store["reports"].get(class_name), store["running"].get(class_name), store["version"]
+
+def show_class_report():
+    selected_class = st.selectbox("Select Class:", CLASSES)
+    request_class_report(selected_class)
+    report, started_at, version = class_report_status(selected_class)
+    col1, col2 = st.columns([3, 1])
+    if started_at:
+        col1.info(f"⏳ Refreshing report (started {started_at:%H:%M:%S})" + (" — showing the last computed result." if report else "..."))
+    elif report:
+        col1.caption(f"Last computed at {report['computed_at']:%Y-%m-%d %H:%M:%S}" + ("" if report["version"] == version else " (marks changed since)"))
+    if col2.button("🔄 Refresh" if not started_at else "🔄 Check Progress", use_container_width=True):
+        if not started_at:
+            request_class_report(selected_class, force=True)
+        st.rerun()
+    if report and report["error"]:
+        st.error(f"Error computing report: {report['error']}")
+    if report and report["data"] is not None:
+        if not report["data"].empty:
+            st.dataframe(report["data"], use_container_width=True)
+        else:
+            st.info("No students found for this class.")
+    with st.expander("⚙️ Precompute Reports"):
+        if st.button("Precompute All Classes"):
+            for class_name in CLASSES:
+                request_class_report(class_name)
+            st.success(f"Queued reports for {', '.join(CLASSES)}.")
+        status_rows = []
+        for class_name in CLASSES:
+            report, started_at, _ = class_report_status(class_name)
+            status_rows.append((class_name, report["computed_at"] if report else None, started_at))
+        st.dataframe(pd.DataFrame(status_rows, columns=["Class", "Last Computed", "Running Since"]), use_container_width=True, hide_index=True)
 
 def show_pass_fail_status():
     st.subheader("✅ Pass/Fail Status Report")
     view_type = st.radio("View By:", ["Student", "Class"], horizontal=True)
     if view_type == "Student":
-        students = execute_query("SELECT id, roll_no, name FROM students ORDER BY roll_no")
-        if students:
-            student_dict = {f"{roll_no} - {name}": (student_id, roll_no, name) for student_id, roll_no, name in students}
-            student_id, roll_no, name = student_dict[st.selectbox("Select Student:", list(student_dict.keys()), key="pass_fail")]
+        student = select_student("pass_fail")
+        if student:
+            student_id, roll_no, name = student
             col1, col2 = st.columns(2)
             col1.markdown(f"**Roll No:** {roll_no}")
             col2.markdown(f"**Name:** {name}")
@@ -159,20 +569,194 @@ def show_pass_fail_status():
                     col4.metric("Failed Subjects", int(result[1]) - (int(result[2]) if result[2] else 0))
             else: 
                 st.info("No marks records found for this student.")
-        else: 
-            st.info("No students found.")
     else:
-        selected_class = st.selectbox("Select Class:", CLASSES)
-        class_data = execute_query("SELECT s.id, s.roll_no, s.name, AVG(m.marks), COUNT(m.subject), SUM(CASE WHEN m.status = 'Pass' THEN 1 ELSE 0 END) FROM students s LEFT JOIN marks m ON s.id = m.student_id WHERE s.class = %s GROUP BY s.id, s.roll_no, s.name ORDER BY s.roll_no", (selected_class,))
-        if class_data:
-            df = pd.DataFrame(class_data, columns=["ID", "Roll No", "Name", "Avg Marks", "Total Subjects", "Passed Subjects"]).drop("ID", axis=1)
-            st.dataframe(df, use_container_width=True)
-        else: 
-            st.info("No students found for this class.")
+        show_class_report()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_attendance_matrix(class_name, start_date, end_date, student_ids):
+    # One range query for the whole class, packed into students x school-days bitsets
+    rows = execute_query("SELECT a.student_id, a.date, a.status FROM attendance a JOIN students s ON s.id = a.student_id WHERE s.class = %s AND a.date BETWEEN %s AND %s", 
+                         (class_name, start_date, end_date)) or []
+    if not rows:
+        return {"days": 0}
+    ids = np.array(student_ids, dtype=np.int64)
+    order = np.argsort(ids)
+    row_ids, row_dates, row_status = zip(*rows)
+    row_ids = np.fromiter(row_ids, dtype=np.int64, count=len(rows))
+    day, dates = pd.factorize(pd.Series(row_dates, dtype=object), sort=True)
+    dates = np.array(list(dates), dtype="datetime64[D]")
+    # Map student ids to roster rows; ids missing from a stale roster are dropped
+    position = np.minimum(np.searchsorted(ids, row_ids, sorter=order), len(ids) - 1)
+    known = ids[order[position]] == row_ids
+    student, day, present_rows = order[position[known]], day[known], pd.Series(row_status, dtype=object).eq("Present").to_numpy()[known]
+    recorded = np.zeros((len(ids), len(dates)), dtype=bool)
+    present = np.zeros((len(ids), len(dates)), dtype=bool)
+    recorded[student, day] = True
+    present[student, day] = present_rows
+    return {"dates": dates, "days": len(dates), "recorded": np.packbits(recorded, axis=1), "present": np.packbits(present, axis=1)}
+
+def attendance_report(matrix, roster, threshold=ATTENDANCE_THRESHOLD):
+    days = matrix["days"]
+    recorded = np.unpackbits(matrix["recorded"], axis=1, count=days).astype(bool)
+    present = np.unpackbits(matrix["present"], axis=1, count=days).astype(bool)
+    absent = recorded & ~present
+    present_days, recorded_days = present.sum(axis=1), recorded.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percentage = np.where(recorded_days > 0, present_days / recorded_days * 100, np.nan)
+        turnout = present.sum(axis=0) / recorded.sum(axis=0) * 100
+    # Length of the absence run ending on each day: day index minus the last non-absent day
+    index = np.arange(days)
+    run = index - np.maximum.accumulate(np.where(absent, -1, index), axis=1)
+    students = pd.DataFrame({
+        "Roll No": [roll_no for _, roll_no, _ in roster.students],
+        "Name": [name for _, _, name in roster.students],
+        "Present Days": present_days,
+        "Recorded Days": recorded_days,
+        "Attendance %": np.round(percentage, 2),
+        "Longest Absence Streak": run.max(axis=1),
+        "Current Absence Streak": run[:, -1],
+        "Below Threshold": percentage < threshold,
+    })
+    daily = pd.Series(turnout, index=pd.DatetimeIndex(matrix["dates"], name="Date"), name="Turnout %")
+    return students, daily
+
+def attendance_matrix_report():
+    st.subheader("🗓️ Attendance Report")
+    col1, col2, col3 = st.columns(3)
+    selected_class = col1.selectbox("Select Class:", CLASSES, key="report_class")
+    date_range = col2.date_input("Date Range:", (dt.date.today() - dt.timedelta(days=30), dt.date.today()), key="report_range")
+    threshold = col3.slider("Attendance Threshold %:", 0, 100, ATTENDANCE_THRESHOLD, key="report_threshold")
+    if len(date_range) != 2:
+        st.info("Select a start and end date.")
+        return
+    roster = get_roster(selected_class)
+    if not roster.students:
+        st.info(f"No students found in {selected_class} class.")
+        return
+    matrix = load_attendance_matrix(selected_class, date_range[0], date_range[1], tuple(student[0] for student in roster.students))
+    if matrix["days"] == 0:
+        st.info("No attendance recorded for this class in the selected range.")
+        return
+    students, daily = attendance_report(matrix, roster, threshold)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Students", len(students))
+    col2.metric("School Days", matrix["days"])
+    col3.metric("Class Attendance %", f"{students['Attendance %'].mean():.2f}%")
+    col4.metric(f"Below {threshold}%", int(students["Below Threshold"].sum()))
+    st.markdown("**Daily Turnout**")
+    st.line_chart(daily)
+    only_flagged = st.checkbox(f"Show only students below {threshold}%")
+    st.dataframe(students[students["Below Threshold"]] if only_flagged else students, use_container_width=True, hide_index=True)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_daily_rollup(start_date, end_date):
+    records = execute_query("SELECT class, date, present, absent FROM daily_class_attendance WHERE date BETWEEN %s AND %s ORDER BY date", (start_date, end_date))
+    return pd.DataFrame(records or [], columns=["Class", "Date", "Present", "Absent"])
+
+def attendance_trends():
+    st.subheader("📉 Attendance Trends")
+    date_range = st.date_input("Date Range:", (dt.date.today() - dt.timedelta(days=90), dt.date.today()), key="trend_range")
+    if len(date_range) != 2:
+        st.info("Select a start and end date.")
+        return
+    # Reads only the per-class daily rollup, never the raw attendance table
+    rollup = load_daily_rollup(date_range[0], date_range[1])
+    if rollup.empty:
+        st.info("No attendance recorded in the selected range.")
+    else:
+        rollup["Date"] = pd.to_datetime(rollup["Date"])
+        rollup["Turnout %"] = rollup["Present"] / (rollup["Present"] + rollup["Absent"]).where(lambda total: total > 0) * 100
+        col1, col2, col3 = st.columns(3)
+        total_present, total_absent = int(rollup["Present"].sum()), int(rollup["Absent"].sum())
+        col1.metric("School Days", rollup["Date"].nunique())
+        col2.metric("Total Present", total_present)
+        col3.metric("Overall Turnout %", f"{total_present / max(total_present + total_absent, 1) * 100:.2f}%")
+        st.markdown("**Daily Turnout % by Class**")
+        st.line_chart(rollup.pivot_table(index="Date", columns="Class", values="Turnout %"))
+        st.markdown("**Daily Absences by Class**")
+        st.bar_chart(rollup.pivot_table(index="Date", columns="Class", values="Absent", aggfunc="sum"))
+    with st.expander("🔧 Rebuild Rollup"):
+        st.write("Recompute the daily rollup for the selected range from the raw attendance table.")
+        if st.button("Rebuild", key="rebuild_rollup") and rebuild_daily_rollup(date_range[0], date_range[1]):
+            load_daily_rollup.clear()
+            st.success("Daily attendance rollup rebuilt!")
+
+def stream_rows(query, params, chunk_size=EXPORT_CHUNK_SIZE):
+    # Unbuffered server-side cursor: only one chunk of rows is held in memory at a time
+    conn = get_connection()
+    if not conn : 
+        return
+    cursor = conn.cursor(pymysql.cursors.SSCursor)
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+        release_connection(conn)
+
+def export_term_data(table, class_name, start_date, end_date, file_format, target):
+    query, columns = EXPORTS[table]
+    params, row_count, writer = (class_name, start_date, end_date + dt.timedelta(days=1)), 0, None
+    try:
+        for rows in stream_rows(query, params):
+            chunk = pd.DataFrame(rows, columns=columns)
+            if file_format == "CSV":
+                chunk.to_csv(target, header=row_count == 0, index=False)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                if writer is None:
+                    batch = pa.Table.from_pandas(chunk, preserve_index=False)
+                    writer = pq.ParquetWriter(target, batch.schema)
+                else:
+                    batch = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+                writer.write_table(batch)
+            row_count += len(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return row_count
+
+def export_data():
+    st.subheader("📤 Export Term Data")
+    col1, col2, col3 = st.columns(3)
+    table, selected_class = col1.selectbox("Data:", list(EXPORTS)), col2.selectbox("Class:", CLASSES, key="export_class")
+    date_range = col3.date_input("Date Range:", (dt.date.today() - dt.timedelta(days=120), dt.date.today()), key="export_range")
+    col1, col2 = st.columns(2)
+    file_format, destination = col1.radio("Format:", ["CSV", "Parquet"], horizontal=True), col2.radio("Destination:", ["Download", "Save on Server"], horizontal=True)
+    if len(date_range) != 2:
+        st.info("Select a start and end date.")
+        return
+    file_name = f"{table.lower()}_{selected_class}_{date_range[0]}_{date_range[1]}.{'csv' if file_format == 'CSV' else 'parquet'}"
+    if st.button("Export"):
+        try:
+            with st.spinner("Exporting..."):
+                if destination == "Download":
+                    buffer = io.BytesIO()
+                    row_count = export_term_data(table, selected_class, date_range[0], date_range[1], file_format, buffer)
+                else:
+                    os.makedirs(EXPORT_DIR, exist_ok=True)
+                    path = os.path.join(EXPORT_DIR, file_name)
+                    with open(path, "wb") as target:
+                        row_count = export_term_data(table, selected_class, date_range[0], date_range[1], file_format, target)
+        except Exception as e:
+            st.error(f"Error exporting data: {e}")
+            return
+        if row_count == 0:
+            st.info("No records found for this class and date range.")
+        elif destination == "Download":
+            st.success(f"Exported {row_count} rows.")
+            st.download_button("Download File", buffer.getvalue(), file_name=file_name)
+        else:
+            st.success(f"Exported {row_count} rows to {path}")
 
 def main():
     st.title("🎓 Student Attendance & Marks System")
-    menu = st.sidebar.radio("Select Operation", ["Add Student", "Mark Attendance", "Add Marks", "View Attendance", "Calculate Attendance", "Show Status"])
+    menu = st.sidebar.radio("Select Operation", ["Add Student", "Mark Attendance", "Add Marks", "View Attendance", "Calculate Attendance", "Attendance Report", "Attendance Trends", "Show Status", "Export Data"])
     if menu == "Add Student": 
         add_student()
     elif menu == "Mark Attendance": 
@@ -183,6 +767,12 @@ def main():
         view_attendance()
     elif menu == "Calculate Attendance": 
         calculate_attendance()
+    elif menu == "Attendance Report": 
+        attendance_matrix_report()
+    elif menu == "Attendance Trends": 
+        attendance_trends()
+    elif menu == "Export Data": 
+        export_data()
     else:
         show_pass_fail_status()
 
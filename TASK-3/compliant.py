@@ -1,6 +1,17 @@
 import streamlit as st
+import pandas as pd
 import pymysql
+import datetime as dt
+import json
+import math
+import os
+import queue
+import random
 import re
+import threading
+import time
+import zlib
+from collections import Counter, defaultdict
 
 st.set_page_config(
     page_title="Complaint Management System",
@@ -9,16 +20,347 @@ st.set_page_config(
 )
 
 
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "Sql@3117",
+    "database": "complaint_db",
+}
+# Queued ingestion: submissions are acknowledged once written to the local WAL
+# and flushed to MySQL in batches by a background writer
+INGEST_QUEUED = True
+INGEST_QUEUE_SIZE, INGEST_BATCH_SIZE, INGEST_FLUSH_SECONDS = 10000, 500, 1.0
+ID_BLOCK_SIZE = 100
+WAL_PATH = "complaints.wal"
+# Flushed rows the WAL may hold before it is rewritten with only unflushed rows
+WAL_COMPACT_ROWS = 5000
+# Column limits from the complaints schema: VARCHAR(100) counts characters,
+# TEXT counts bytes
+FIELD_MAX_CHARS, DESCRIPTION_MAX_BYTES = 100, 65535
+# Errors where the server or connection is at fault, not the rows
+TRANSIENT_ERRORS = (pymysql.err.OperationalError, pymysql.err.InterfaceError)
+INSERT_COMPLAINTS = (
+    "INSERT INTO complaints (id, name, email, category, description, status, created_at) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s)"
+)
+
+
 def get_connection():
     try:
-        return pymysql.connect(
-            host="localhost", user="root", password="Sql@3117", database="complaint_db"
-        )
+        return pymysql.connect(**DB_CONFIG)
     except Exception as e:
         st.error(f"Database connection error: {e}")
         return None
 
 
+class ComplaintIdAllocator:
+    # Hands out complaint IDs from blocks reserved in complaint_id_sequence, so
+    # an ID is known (and can be acknowledged) before the row is written. IDs
+    # stay outstanding until released, because rows are not written in ID
+    # order: a queued row can land after a later one written inline.
+    def __init__(self, block_size=ID_BLOCK_SIZE):
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        self.next_id = self.end_id = 0
+        self.outstanding = set()
+
+    def allocate(self):
+        with self.lock:
+            if self.next_id >= self.end_id:
+                self.next_id, self.end_id = self.reserve()
+            complaint_id = self.next_id
+            self.next_id += 1
+            self.outstanding.add(complaint_id)
+            return complaint_id
+
+    def release(self, complaint_ids):
+        # For IDs whose rows are written, or never will be
+        with self.lock:
+            self.outstanding.difference_update(complaint_ids)
+
+    def watermark(self):
+        # Every ID this process allocated up to the watermark is settled;
+        # None when nothing is outstanding
+        with self.lock:
+            return min(self.outstanding) - 1 if self.outstanding else None
+
+    def reserve(self):
+        conn = pymysql.connect(**DB_CONFIG)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE complaint_id_sequence SET next_id = LAST_INSERT_ID(next_id + %s) "
+                "WHERE name = 'complaints'",
+                (self.block_size,),
+            )
+            if cursor.rowcount != 1:
+                # Without the row LAST_INSERT_ID() would be 0 and every block
+                # would hand out the same IDs
+                raise RuntimeError(
+                    "complaint_id_sequence is not initialised; run database.py"
+                )
+            cursor.execute("SELECT LAST_INSERT_ID()")
+            end_id = cursor.fetchone()[0]
+            conn.commit()
+            return end_id - self.block_size, end_id
+        finally:
+            conn.close()
+
+
+class ComplaintIngestor:
+    # Write-behind queue for complaint submissions. Each submission is fsynced
+    # to the WAL before it is acknowledged; a background thread flushes the
+    # queue in multi-row INSERT batches when INGEST_BATCH_SIZE rows are waiting
+    # or INGEST_FLUSH_SECONDS have passed. WAL entries are replayed on startup;
+    # a replayed row whose ID is already stored with the same content is
+    # skipped, and one stored with different content is set aside in the
+    # .rejected file rather than overwritten. Only transient errors are
+    # retried; a row MySQL refuses is set aside the same way.
+    def __init__(self, allocator, wal_path=WAL_PATH):
+        self.allocator = allocator
+        self.wal_path = wal_path
+        self.queue = queue.Queue(maxsize=INGEST_QUEUE_SIZE)
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.pending = {}
+        self.flushed = 0
+        self.conn = None
+        self.recover()
+        self.wal = open(wal_path, "a", encoding="utf-8")
+        threading.Thread(target=self.run, name="complaint-writer", daemon=True).start()
+
+    def recover(self):
+        if not os.path.exists(self.wal_path):
+            return
+        rows = []
+        with open(self.wal_path, encoding="utf-8") as wal:
+            for line in wal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final line: never fsynced, so never acknowledged
+                    continue
+                record[6] = dt.datetime.fromisoformat(record[6])
+                rows.append(tuple(record))
+        if rows:
+            self.write(rows)
+        open(self.wal_path, "w").close()
+
+    def submit(self, name, email, category, description):
+        row = (
+            self.allocator.allocate(),
+            name,
+            email,
+            category,
+            description,
+            "Open",
+            dt.datetime.now().replace(microsecond=0),
+        )
+        with self.lock:
+            self.wal.write(json.dumps(row, default=str) + "\n")
+            self.wal.flush()
+            os.fsync(self.wal.fileno())
+            self.pending[row[0]] = row
+        try:
+            self.queue.put(row, timeout=1)
+        except queue.Full:
+            # Backpressure: write this submission inline rather than wait
+            try:
+                if self.write([row], set_aside=False):
+                    raise ValueError("The complaint could not be stored")
+            except Exception:
+                # The user is told it failed, so it must not be replayed later
+                with self.lock:
+                    self.pending.pop(row[0], None)
+                    self.compact()
+                self.allocator.release([row[0]])
+                raise
+            self.mark_written([row])
+        return row[0]
+
+    def find_pending(self, complaint_id):
+        with self.lock:
+            return self.pending.get(complaint_id)
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + INGEST_FLUSH_SECONDS
+            while len(batch) < INGEST_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            while True:
+                try:
+                    self.write(batch)
+                    break
+                except Exception:
+                    # write() only raises when MySQL is unavailable; the batch
+                    # is safe in the WAL, so retry until it is back
+                    time.sleep(INGEST_FLUSH_SECONDS)
+            self.mark_written(batch)
+
+    def write(self, rows, set_aside=True):
+        # Returns the rows MySQL refused; with set_aside they are also
+        # appended to the .rejected file
+        with self.write_lock:
+            try:
+                if self.conn is None:
+                    self.conn = pymysql.connect(**DB_CONFIG)
+                refused = self.insert(self.conn.cursor(), rows)
+            except Exception:
+                if self.conn is not None:
+                    self.conn.close()
+                self.conn = None
+                raise
+        if refused and set_aside:
+            self.set_aside(refused)
+        return refused
+
+    def insert(self, cursor, rows):
+        # A batch that fails for a reason other than the connection is split
+        # in half until the refused rows are isolated, so the rest still land
+        try:
+            try:
+                cursor.executemany(INSERT_COMPLAINTS, rows)
+            except pymysql.err.IntegrityError as e:
+                # 1062: rows replayed from a WAL that was not yet compacted
+                if e.args[0] != 1062:
+                    raise
+                self.conn.rollback()
+                rows = self.unwritten(cursor, rows)
+                if rows:
+                    cursor.executemany(INSERT_COMPLAINTS, rows)
+            self.conn.commit()
+            return []
+        except TRANSIENT_ERRORS:
+            raise
+        except pymysql.err.MySQLError:
+            self.conn.rollback()
+            if len(rows) == 1:
+                return rows
+            middle = len(rows) // 2
+            return self.insert(cursor, rows[:middle]) + self.insert(
+                cursor, rows[middle:]
+            )
+
+    def unwritten(self, cursor, rows):
+        ids = [row[0] for row in rows]
+        placeholders = ", ".join(["%s"] * len(ids))
+        columns = "id, name, email, category, description, created_at"
+        cursor.execute(
+            f"SELECT {columns} FROM complaints WHERE id IN ({placeholders}) "
+            f"UNION ALL SELECT {columns} FROM complaints_archive WHERE id IN ({placeholders})",
+            ids * 2,
+        )
+        stored = {row[0]: row[1:] for row in cursor.fetchall()}
+        conflicts = [
+            row
+            for row in rows
+            if row[0] in stored and stored[row[0]] != row[1:5] + row[6:]
+        ]
+        if conflicts:
+            self.set_aside(conflicts)
+        return [row for row in rows if row[0] not in stored]
+
+    def set_aside(self, rows):
+        with open(self.wal_path + ".rejected", "a", encoding="utf-8") as rejected:
+            for row in rows:
+                rejected.write(json.dumps(row, default=str) + "\n")
+            rejected.flush()
+            os.fsync(rejected.fileno())
+
+    def mark_written(self, rows):
+        with self.lock:
+            for row in rows:
+                self.pending.pop(row[0], None)
+            self.flushed += len(rows)
+            self.allocator.release([row[0] for row in rows])
+            if not self.pending:
+                # Everything acknowledged is in MySQL, so the WAL can start over
+                self.wal.truncate(0)
+                self.wal.flush()
+                os.fsync(self.wal.fileno())
+                self.flushed = 0
+            elif self.flushed >= WAL_COMPACT_ROWS:
+                self.compact()
+
+    def compact(self):
+        # Rewrites the WAL with only the rows not yet in MySQL; callers hold
+        # self.lock. The swap is atomic, so a crash leaves one complete WAL.
+        temp_path = self.wal_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as wal:
+            for row in self.pending.values():
+                wal.write(json.dumps(row, default=str) + "\n")
+            wal.flush()
+            os.fsync(wal.fileno())
+        self.wal.close()
+        os.replace(temp_path, self.wal_path)
+        self.wal = open(self.wal_path, "a", encoding="utf-8")
+        self.flushed = 0
+
+
+@st.cache_resource
+def get_id_allocator():
+    return ComplaintIdAllocator()
+
+
+@st.cache_resource
+def get_ingestor():
+    return ComplaintIngestor(get_id_allocator())
+
+
+def complaint_errors(name, email, category, description):
+    errors = []
+    for label, value in (("Name", name), ("Email", email), ("Category", category)):
+        if len(value) > FIELD_MAX_CHARS:
+            errors.append(f"{label} must be at most {FIELD_MAX_CHARS} characters!")
+    if len(description.encode("utf-8")) > DESCRIPTION_MAX_BYTES:
+        errors.append(f"Description must be at most {DESCRIPTION_MAX_BYTES} bytes!")
+    return errors
+
+
+def submit_complaint(name, email, category, description):
+    # Checked before an ID is allocated: a row MySQL would refuse must never
+    # reach the WAL
+    errors = complaint_errors(name, email, category, description)
+    if errors:
+        raise ValueError(" ".join(errors))
+    if INGEST_QUEUED:
+        return get_ingestor().submit(name, email, category, description)
+    allocator = get_id_allocator()
+    complaint_id = allocator.allocate()
+    try:
+        conn = pymysql.connect(**DB_CONFIG)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO complaints (id, name, email, category, description, status) VALUES (%s, %s, %s, %s, %s, 'Open')",
+                (complaint_id, name, email, category, description),
+            )
+            conn.commit()
+            return complaint_id
+        finally:
+            conn.close()
+    finally:
+        allocator.release([complaint_id])
+
+
+def find_complaint(cursor, complaint_id):
+    # Hot table first, then the archive, then submissions still in the queue
+    complaint = get_complaint(cursor, complaint_id) or get_archived_complaint(
+        cursor, complaint_id
+    )
+    if complaint is None and INGEST_QUEUED:
+        # Acknowledged but not yet flushed by the writer
+        complaint = get_ingestor().find_pending(complaint_id)
+    return complaint
+
+
 def validate_email(email):
     return (
         re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", email) is not None
@@ -41,6 +383,870 @@ def display_complaint(complaint):
     st.write(complaint[4])
 
 
+SEARCH_PAGE_SIZE = 20
+PAGE_SIZES = [10, 25, 50, 100]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+COMPLAINT_COLUMNS = "id, name, email, category, description, status, created_at"
+LIST_COLUMNS = ["ID", "Name", "Email", "Category", "Status", "Created"]
+# Near-duplicate detection: word 3-gram shingles, 60 MinHash permutations
+# split into 20 LSH bands of 3 rows (~93% recall at 0.5 Jaccard similarity)
+SHINGLE_SIZE, MINHASH_PERMUTATIONS, LSH_BANDS = 3, 60, 20
+DUPLICATE_THRESHOLD = 0.5
+DUPLICATE_LOG_PATH = "duplicates.jsonl"
+# Complaints read and merged into the duplicate index per lock acquisition
+CATCH_UP_CHUNK = 500
+CLUSTER_LIMIT = 50
+MAX_BULK_IDS = 1000
+# Open-age buckets as (label, lower bound in days)
+AGE_BUCKETS = [
+    ("< 1 day", 0),
+    ("1–3 days", 1),
+    ("3–7 days", 3),
+    ("1–4 weeks", 7),
+    ("> 4 weeks", 28),
+]
+ANALYTICS_TTL = 300
+# Complaints Resolved/Closed for longer than this move to complaints_archive
+ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE = 90, 500
+
+
+def get_status_counts(cursor):
+    cursor.execute("SELECT status, COUNT(*) FROM complaints GROUP BY status")
+    return dict(cursor.fetchall())
+
+
+def get_complaints_page(cursor, status=None, after=None, page_size=25):
+    # Keyset pagination on (created_at, id), newest first; the list omits the
+    # description, which is only loaded for the selected complaint
+    clauses, params = [], []
+    if status:
+        clauses.append("status = %s")
+        params.append(status)
+    if after is not None:
+        clauses.append("(created_at < %s OR (created_at = %s AND id < %s))")
+        params.extend([after[0], after[0], after[1]])
+    query = "SELECT id, name, email, category, status, created_at FROM complaints"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+    params.append(page_size)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    next_key = (rows[-1][5], rows[-1][0]) if len(rows) == page_size else None
+    return rows, next_key
+
+
+def get_complaint(cursor, complaint_id):
+    cursor.execute(
+        f"SELECT {COMPLAINT_COLUMNS} FROM complaints WHERE id = %s", (complaint_id,)
+    )
+    return cursor.fetchone()
+
+
+def get_archived_complaint(cursor, complaint_id):
+    cursor.execute(
+        f"SELECT {COMPLAINT_COLUMNS} FROM complaints_archive WHERE id = %s",
+        (complaint_id,),
+    )
+    return cursor.fetchone()
+
+
+def tokenize(text):
+    return re.findall(r"[a-z0-9]{2,}", text.lower())
+
+
+def parse_search_query(query):
+    # Quoted text is an exact phrase, everything else is an individual keyword
+    phrases = [" ".join(tokenize(phrase)) for phrase in re.findall(r'"([^"]*)"', query)]
+    terms = tokenize(re.sub(r'"[^"]*"', " ", query))
+    return terms, [phrase for phrase in phrases if phrase]
+
+
+class ComplaintIndex:
+    # In-memory inverted index over category + description, used when the
+    # FULLTEXT index is unavailable. It catches up on new complaint IDs before
+    # each search, since descriptions never change after submission. last_id
+    # only moves up to the watermark, below which no write is outstanding;
+    # rows above it are read again on the next catch-up and skipped.
+    def __init__(self, watermark=None):
+        self.lock = threading.Lock()
+        self.watermark = watermark
+        self.postings = defaultdict(dict)
+        self.texts = {}
+        self.last_id = 0
+
+    def add(self, complaint_id, category, description):
+        if complaint_id in self.texts:
+            return
+        tokens = tokenize(f"{category} {description}")
+        self.texts[complaint_id] = f" {' '.join(tokens)} "
+        for token, count in Counter(tokens).items():
+            self.postings[token][complaint_id] = count
+
+    def catch_up(self, cursor):
+        # Taken before the read: anything settled by then is visible to it
+        settled = self.watermark() if self.watermark else None
+        cursor.execute(
+            "SELECT id, category, description FROM complaints WHERE id > %s ORDER BY id",
+            (self.last_id,),
+        )
+        rows = cursor.fetchall()
+        for complaint_id, category, description in rows:
+            self.add(complaint_id, category, description)
+        if rows:
+            newest = rows[-1][0]
+            if settled is not None:
+                newest = max(self.last_id, min(newest, settled))
+            self.last_id = newest
+
+    def search(self, terms, phrases):
+        words = terms + [word for phrase in phrases for word in phrase.split()]
+        if not words:
+            return []
+        postings = [self.postings.get(word, {}) for word in words]
+        candidates = set.intersection(*(set(posting) for posting in postings))
+        candidates = [
+            complaint_id
+            for complaint_id in candidates
+            if all(f" {phrase} " in self.texts[complaint_id] for phrase in phrases)
+        ]
+        # TF-IDF ranking; ties go to the newest complaint
+        total = len(self.texts)
+        idf = [math.log(1 + total / len(posting)) for posting in postings]
+        scores = {
+            complaint_id: sum(
+                posting[complaint_id] * weight for posting, weight in zip(postings, idf)
+            )
+            for complaint_id in candidates
+        }
+        return sorted(
+            scores, key=lambda complaint_id: (-scores[complaint_id], -complaint_id)
+        )
+
+
+@st.cache_resource
+def get_complaint_index():
+    return ComplaintIndex(get_id_allocator().watermark)
+
+
+def fulltext_search(cursor, terms, phrases, page, page_size):
+    boolean_query = " ".join(
+        [f'+"{phrase}"' for phrase in phrases] + [f"+{term}*" for term in terms]
+    )
+    natural_query = " ".join(terms + phrases)
+    cursor.execute(
+        "SELECT COUNT(*) FROM complaints WHERE MATCH(description, category) AGAINST (%s IN BOOLEAN MODE)",
+        (boolean_query,),
+    )
+    total = cursor.fetchone()[0]
+    cursor.execute(
+        f"SELECT {COMPLAINT_COLUMNS}, MATCH(description, category) AGAINST (%s) AS score "
+        "FROM complaints WHERE MATCH(description, category) AGAINST (%s IN BOOLEAN MODE) "
+        "ORDER BY score DESC, id DESC LIMIT %s OFFSET %s",
+        (natural_query, boolean_query, page_size, (page - 1) * page_size),
+    )
+    return total, [row[:7] for row in cursor.fetchall()]
+
+
+def index_search(cursor, terms, phrases, page, page_size):
+    index = get_complaint_index()
+    with index.lock:
+        index.catch_up(cursor)
+        ranked = index.search(terms, phrases)
+    page_ids = ranked[(page - 1) * page_size : page * page_size]
+    if not page_ids:
+        return len(ranked), []
+    placeholders = ", ".join(["%s"] * len(page_ids))
+    cursor.execute(
+        f"SELECT {COMPLAINT_COLUMNS} FROM complaints WHERE id IN ({placeholders})",
+        page_ids,
+    )
+    rows = {row[0]: row for row in cursor.fetchall()}
+    return len(ranked), [
+        rows[complaint_id] for complaint_id in page_ids if complaint_id in rows
+    ]
+
+
+def search_complaints(cursor, query, page=1, page_size=SEARCH_PAGE_SIZE):
+    terms, phrases = parse_search_query(query)
+    if not terms and not phrases:
+        return 0, []
+    try:
+        return fulltext_search(cursor, terms, phrases, page, page_size)
+    except pymysql.err.MySQLError as e:
+        # 1191: no FULLTEXT index on these columns (e.g. schema not migrated)
+        if e.args[0] != 1191:
+            raise
+        return index_search(cursor, terms, phrases, page, page_size)
+
+
+class DuplicateIndex:
+    # MinHash signatures of complaint descriptions with an LSH banding index.
+    # Complaints whose estimated similarity reaches DUPLICATE_THRESHOLD are
+    # merged into one cluster (union-find). Changes are persisted to an
+    # append-only JSON-lines log of additions ("a"), merges ("m") and catch-up
+    # checkpoints ("c"), so a restart only has to catch up on new IDs. Callers
+    # take the new entries under self.lock and append them after releasing it.
+    MERSENNE_PRIME = (1 << 61) - 1
+
+    def __init__(self, log_path=DUPLICATE_LOG_PATH, watermark=None):
+        self.lock = threading.Lock()
+        self.log_lock = threading.Lock()
+        self.catch_up_lock = threading.Lock()
+        self.log_path = log_path
+        self.watermark = watermark
+        self.header = {
+            "permutations": MINHASH_PERMUTATIONS,
+            "bands": LSH_BANDS,
+            "shingle_size": SHINGLE_SIZE,
+        }
+        rng = random.Random(42)
+        self.permutations = [
+            (rng.randrange(1, self.MERSENNE_PRIME), rng.randrange(self.MERSENNE_PRIME))
+            for _ in range(MINHASH_PERMUTATIONS)
+        ]
+        self.rows = MINHASH_PERMUTATIONS // LSH_BANDS
+        self.signatures = {}
+        self.buckets = defaultdict(set)
+        self.parent = {}
+        self.last_id = 0
+        self.unsaved = []
+        self.load()
+
+    def signature(self, description):
+        tokens = tokenize(description)
+        shingles = {
+            " ".join(tokens[i : i + SHINGLE_SIZE])
+            for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))
+        }
+        hashes = [zlib.crc32(shingle.encode()) for shingle in shingles]
+        return tuple(
+            min((a * h + b) % self.MERSENNE_PRIME for h in hashes)
+            for a, b in self.permutations
+        )
+
+    def band_keys(self, signature):
+        return [
+            (band, hash(signature[band * self.rows : (band + 1) * self.rows]))
+            for band in range(LSH_BANDS)
+        ]
+
+    def find(self, complaint_id):
+        root = complaint_id
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while complaint_id != root:
+            complaint_id, self.parent[complaint_id] = self.parent[complaint_id], root
+        return root
+
+    def similar(self, signature):
+        candidates = set().union(
+            *(self.buckets.get(key, ()) for key in self.band_keys(signature))
+        )
+        matches = []
+        for candidate in candidates:
+            other = self.signatures[candidate]
+            score = sum(x == y for x, y in zip(signature, other)) / len(signature)
+            if score >= DUPLICATE_THRESHOLD:
+                matches.append((candidate, score))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def add(self, complaint_id, description, signature=None):
+        # Returns the near-duplicates the complaint was clustered with. The
+        # signature can be computed beforehand, without holding self.lock.
+        if complaint_id in self.signatures:
+            return []
+        if signature is None:
+            signature = self.signature(description)
+        matches = self.similar(signature)
+        self.index_signature(complaint_id, signature)
+        self.unsaved.append(["a", complaint_id, signature])
+        for candidate, _ in matches:
+            root, other = self.find(complaint_id), self.find(candidate)
+            if root != other:
+                self.parent[max(root, other)] = min(root, other)
+                self.unsaved.append(["m", max(root, other), min(root, other)])
+        return matches
+
+    def index_signature(self, complaint_id, signature):
+        self.signatures[complaint_id] = signature
+        for key in self.band_keys(signature):
+            self.buckets[key].add(complaint_id)
+
+    def catch_up(self, cursor, chunk_size=CATCH_UP_CHUNK):
+        # Reads new complaints in ID chunks and signs them without holding
+        # self.lock, which is only taken to merge each chunk, so submissions
+        # wait for one merge at most. last_id stops at the watermark, taken
+        # before the first read, like ComplaintIndex. Returns False without
+        # waiting if another thread is already catching up.
+        if not self.catch_up_lock.acquire(blocking=False):
+            return False
+        try:
+            settled = self.watermark() if self.watermark else None
+            after = self.last_id
+            while True:
+                cursor.execute(
+                    "SELECT id, description FROM complaints WHERE id > %s ORDER BY id LIMIT %s",
+                    (after, chunk_size),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                signed = [
+                    (complaint_id, description, self.signature(description))
+                    for complaint_id, description in rows
+                    if complaint_id not in self.signatures
+                ]
+                after = rows[-1][0]
+                with self.lock:
+                    for complaint_id, description, signature in signed:
+                        self.add(complaint_id, description, signature)
+                    checkpoint = after if settled is None else min(after, settled)
+                    if checkpoint > self.last_id:
+                        self.last_id = checkpoint
+                        self.unsaved.append(["c", checkpoint])
+                    entries = self.take_unsaved()
+                self.append_log(entries)
+                if len(rows) < chunk_size:
+                    break
+            return True
+        finally:
+            self.catch_up_lock.release()
+
+    def clusters(self):
+        groups = defaultdict(list)
+        for complaint_id in self.signatures:
+            groups[self.find(complaint_id)].append(complaint_id)
+        return sorted(
+            (sorted(ids) for ids in groups.values() if len(ids) > 1),
+            key=lambda ids: (-len(ids), ids[0]),
+        )
+
+    def take_unsaved(self):
+        entries, self.unsaved = self.unsaved, []
+        return entries
+
+    def append_log(self, entries):
+        if not entries:
+            return
+        lines = "".join(json.dumps(entry) + "\n" for entry in entries)
+        with self.log_lock, open(self.log_path, "a", encoding="utf-8") as log:
+            log.write(lines)
+
+    def load(self):
+        entries = 0
+        try:
+            with open(self.log_path, encoding="utf-8") as log:
+                if json.loads(next(log, "null")) != self.header:
+                    raise ValueError("built with different MinHash settings")
+                for line in log:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn final line from an interrupted append
+                        continue
+                    entries += 1
+                    if entry[0] == "a":
+                        self.index_signature(entry[1], tuple(entry[2]))
+                    elif entry[0] == "m":
+                        self.parent[entry[1]] = entry[2]
+                    else:
+                        self.last_id = max(self.last_id, entry[1])
+        except (OSError, ValueError, IndexError):
+            # Missing or unusable log: start over and rebuild by catching up
+            self.signatures, self.buckets, self.parent = {}, defaultdict(set), {}
+            self.last_id = entries = 0
+        # Compaction happens on startup, before the index is shared
+        if entries == 0 or entries > 2 * len(self.signatures) + 1000:
+            self.compact()
+
+    def compact(self):
+        with open(self.log_path + ".tmp", "w", encoding="utf-8") as log:
+            log.write(json.dumps(self.header) + "\n")
+            for complaint_id, signature in self.signatures.items():
+                log.write(json.dumps(["a", complaint_id, signature]) + "\n")
+            for child, root in self.parent.items():
+                if child != root:
+                    log.write(json.dumps(["m", child, root]) + "\n")
+            log.write(json.dumps(["c", self.last_id]) + "\n")
+        os.replace(self.log_path + ".tmp", self.log_path)
+
+
+@st.cache_resource
+def get_duplicate_index():
+    # The first catch-up after a restart (or a rebuild) can cover every
+    # complaint, so it runs in the background rather than in a page render
+    index = DuplicateIndex(watermark=get_id_allocator().watermark)
+    threading.Thread(
+        target=catch_up_in_background,
+        args=(index,),
+        name="duplicate-catch-up",
+        daemon=True,
+    ).start()
+    return index
+
+
+def catch_up_in_background(index):
+    try:
+        conn = pymysql.connect(**DB_CONFIG)
+        try:
+            index.catch_up(conn.cursor())
+        finally:
+            conn.close()
+    except pymysql.err.MySQLError:
+        # The next catch-up from the admin page resumes from last_id
+        pass
+
+
+def flag_duplicates(complaint_id, description):
+    # Submission-time lookup; only catch_up advances last_id, so rows that
+    # reach MySQL out of ID order are still picked up by the next catch-up
+    index = get_duplicate_index()
+    signature = index.signature(description)
+    with index.lock:
+        matches = index.add(complaint_id, description, signature)
+        entries = index.take_unsaved()
+    index.append_log(entries)
+    return matches
+
+
+def get_clusters(cursor, limit=CLUSTER_LIMIT):
+    index = get_duplicate_index()
+    index.catch_up(cursor)
+    with index.lock:
+        clusters = index.clusters()[:limit]
+        entries = index.take_unsaved()
+    index.append_log(entries)
+    ids = [complaint_id for cluster in clusters for complaint_id in cluster]
+    if not ids:
+        return []
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(
+        f"SELECT id, name, email, category, status, created_at FROM complaints WHERE id IN ({placeholders})",
+        ids,
+    )
+    rows = {row[0]: row for row in cursor.fetchall()}
+    return [
+        [rows[complaint_id] for complaint_id in cluster if complaint_id in rows]
+        for cluster in clusters
+    ]
+
+
+def lock_complaints(cursor, complaint_ids):
+    placeholders = ", ".join(["%s"] * len(complaint_ids))
+    cursor.execute(
+        f"SELECT id, status, category, created_at FROM complaints WHERE id IN ({placeholders}) FOR UPDATE",
+        list(complaint_ids),
+    )
+    return {row[0]: row for row in cursor.fetchall()}
+
+
+def apply_status_changes(cursor, changes, status, expected=None):
+    # One set-based UPDATE for the locked rows in changes, plus their
+    # complaint_status_history rows; the caller owns the transaction.
+    # expected maps each ID to the status it must still have.
+    if not changes:
+        return
+    if expected is None:
+        placeholders = ", ".join(["%s"] * len(changes))
+        query = f"UPDATE complaints SET status = %s WHERE id IN ({placeholders})"
+        params = [status, *(row[0] for row in changes)]
+    else:
+        pairs = ", ".join(["(%s, %s)"] * len(changes))
+        query = f"UPDATE complaints SET status = %s WHERE (id, status) IN ({pairs})"
+        params = [status]
+        for row in changes:
+            params.extend([row[0], expected[row[0]]])
+    cursor.execute(query, params)
+    cursor.executemany(
+        "INSERT INTO complaint_status_history (complaint_id, category, opened_at, old_status, new_status) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        [
+            (complaint_id, category, created_at, old_status, status)
+            for complaint_id, old_status, category, created_at in changes
+        ],
+    )
+
+
+def change_status(conn, complaint_ids, status):
+    # Updates the status and appends to complaint_status_history in one
+    # transaction; complaints already in the new status are left untouched
+    cursor = conn.cursor()
+    try:
+        changes = [
+            row
+            for row in lock_complaints(cursor, complaint_ids).values()
+            if row[1] != status
+        ]
+        apply_status_changes(cursor, changes, status)
+        conn.commit()
+        return len(changes)
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def transition_status(conn, expected, status):
+    # Optimistic bulk transition: expected maps each complaint ID to the
+    # status the admin saw, and a complaint only moves if it still has it.
+    # Returns an outcome for every ID.
+    complaint_ids = list(expected)
+    cursor = conn.cursor()
+    try:
+        current = lock_complaints(cursor, complaint_ids)
+        changes = [
+            row
+            for row in current.values()
+            if row[1] == expected[row[0]] and row[1] != status
+        ]
+        apply_status_changes(cursor, changes, status, expected)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    missing = [
+        complaint_id for complaint_id in complaint_ids if complaint_id not in current
+    ]
+    archived = set()
+    if missing:
+        placeholders = ", ".join(["%s"] * len(missing))
+        cursor.execute(
+            f"SELECT id FROM complaints_archive WHERE id IN ({placeholders})", missing
+        )
+        archived = {row[0] for row in cursor.fetchall()}
+    outcomes = {}
+    for complaint_id in complaint_ids:
+        if complaint_id in archived:
+            outcomes[complaint_id] = "Archived"
+        elif complaint_id not in current:
+            outcomes[complaint_id] = "Not found"
+        elif current[complaint_id][1] == expected[complaint_id] != status:
+            outcomes[complaint_id] = f"Updated to {status}"
+        else:
+            outcomes[complaint_id] = f"Skipped: status is {current[complaint_id][1]}"
+    return outcomes
+
+
+def parse_complaint_ids(text):
+    ids = [int(value) for value in re.findall(r"\d+", text)]
+    return list(dict.fromkeys(ids))
+
+
+def show_transition_outcomes(outcomes):
+    updated = sum(outcome.startswith("Updated") for outcome in outcomes.values())
+    if updated:
+        st.success(f"✅ {updated} of {len(outcomes)} complaints updated.")
+    else:
+        st.warning("No complaints were updated.")
+    st.dataframe(
+        pd.DataFrame(list(outcomes.items()), columns=["ID", "Outcome"]),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+def show_clusters(conn):
+    cursor = conn.cursor()
+    clusters = [cluster for cluster in get_clusters(cursor) if len(cluster) > 1]
+    # Outcome of "Apply to Cluster", kept across the rerun that refreshes the clusters
+    if "cluster_outcome" in st.session_state:
+        succeeded, message = st.session_state.pop("cluster_outcome")
+        (st.success if succeeded else st.error)(message)
+    if get_duplicate_index().catch_up_lock.locked():
+        st.caption(
+            "The duplicate index is still catching up; clusters may be incomplete."
+        )
+    if not clusters:
+        st.info("No near-duplicate clusters found.")
+        return
+    st.caption(
+        f"Showing the {len(clusters)} largest clusters of near-identical complaints."
+    )
+    for cluster in clusters:
+        statuses = Counter(row[4] for row in cluster)
+        head = cluster[0]
+        with st.expander(
+            f"Cluster #{head[0]} | {head[3]} | {len(cluster)} complaints | "
+            + ", ".join(f"{status}: {count}" for status, count in statuses.items())
+        ):
+            st.dataframe(
+                pd.DataFrame(cluster, columns=LIST_COLUMNS),
+                use_container_width=True,
+                hide_index=True,
+            )
+            col1, col2 = st.columns([3, 1])
+            new_status = col1.selectbox(
+                "New Status:", STATUSES, key=f"cluster_status_{head[0]}"
+            )
+            if col2.button("Apply to Cluster", key=f"cluster_apply_{head[0]}"):
+                try:
+                    updated = change_status(
+                        conn, [row[0] for row in cluster], new_status
+                    )
+                    st.session_state.cluster_outcome = (
+                        True,
+                        f"✅ {updated} complaints updated to: {new_status}",
+                    )
+                except Exception as e:
+                    st.session_state.cluster_outcome = (
+                        False,
+                        f"Error updating cluster #{head[0]}: {e}",
+                    )
+                st.rerun()
+
+
+def daily_flows(cursor, start, end):
+    # Complaints entering/leaving each status per day in [start, end), read
+    # with range scans on idx_complaints_created and idx_history_changed
+    cursor.execute(
+        """
+        SELECT day, status, SUM(entered), SUM(exited) FROM (
+            SELECT DATE(created_at) AS day, 'Open' AS status, COUNT(*) AS entered, 0 AS exited
+            FROM complaints WHERE created_at >= %s AND created_at < %s
+            GROUP BY DATE(created_at)
+            UNION ALL
+            SELECT DATE(changed_at), new_status, COUNT(*), 0
+            FROM complaint_status_history WHERE changed_at >= %s AND changed_at < %s
+            GROUP BY DATE(changed_at), new_status
+            UNION ALL
+            SELECT DATE(changed_at), old_status, 0, COUNT(*)
+            FROM complaint_status_history WHERE changed_at >= %s AND changed_at < %s
+            GROUP BY DATE(changed_at), old_status
+        ) flows
+        GROUP BY day, status
+        """,
+        (start, end) * 3,
+    )
+    return list(cursor.fetchall())
+
+
+def refresh_daily_rollup(conn):
+    # Completed days are rolled up once into complaint_daily_status; only
+    # the days since the last refresh are scanned
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(day) FROM complaint_daily_status")
+    last_day = cursor.fetchone()[0]
+    if last_day is None:
+        cursor.execute("SELECT DATE(MIN(created_at)) FROM complaints")
+        start = cursor.fetchone()[0]
+    else:
+        start = last_day + dt.timedelta(days=1)
+    today = dt.date.today()
+    if start is None or start >= today:
+        return
+    flows = daily_flows(cursor, start, today)
+    yesterday = today - dt.timedelta(days=1)
+    if not any(day == yesterday for day, *_ in flows):
+        # An empty marker row records that the range was rolled up
+        flows.append((yesterday, "Open", 0, 0))
+    cursor.executemany(
+        "INSERT INTO complaint_daily_status (day, status, entered, exited) VALUES (%s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE entered = VALUES(entered), exited = VALUES(exited)",
+        flows,
+    )
+    conn.commit()
+
+
+@st.cache_data(ttl=ANALYTICS_TTL)
+def load_backlog(days):
+    # Complaints in each status at the end of each day, from the cumulative
+    # sum of the daily rollup plus today's live flows. None without a
+    # connection, like the other analytics loaders.
+    conn = get_connection()
+    if not conn:
+        return None
+    try:
+        refresh_daily_rollup(conn)
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT day, status, entered, exited FROM complaint_daily_status"
+        )
+        rows = list(cursor.fetchall())
+        today = dt.date.today()
+        rows += daily_flows(cursor, today, today + dt.timedelta(days=1))
+    finally:
+        conn.close()
+    if not rows:
+        return pd.DataFrame(columns=STATUSES)
+    flows = pd.DataFrame(rows, columns=["day", "status", "entered", "exited"])
+    flows["net"] = flows["entered"].astype(int) - flows["exited"].astype(int)
+    backlog = (
+        flows.pivot_table(index="day", columns="status", values="net", aggfunc="sum")
+        .reindex(columns=STATUSES, fill_value=0)
+        .fillna(0)
+    )
+    backlog.index = pd.to_datetime(backlog.index)
+    backlog = (
+        backlog.reindex(
+            pd.date_range(backlog.index.min(), pd.Timestamp(today)), fill_value=0
+        )
+        .cumsum()
+        .astype(int)
+    )
+    return backlog.tail(days)
+
+
+@st.cache_data(ttl=ANALYTICS_TTL)
+def load_resolution_times(start, end):
+    # Median and p90 hours from submission to resolution, for complaints
+    # resolved in [start, end]. A complaint reopened and resolved again in
+    # the range counts once, at its first resolution there.
+    conn = get_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT category, TIMESTAMPDIFF(SECOND, opened_at, MIN(changed_at)) / 3600 "
+            "FROM complaint_status_history WHERE changed_at >= %s AND changed_at < %s "
+            "AND new_status IN ('Resolved', 'Closed') AND old_status NOT IN ('Resolved', 'Closed') "
+            "GROUP BY complaint_id, category, opened_at",
+            (start, end + dt.timedelta(days=1)),
+        )
+        rows = cursor.fetchall()
+    finally:
+        conn.close()
+    hours = pd.DataFrame(rows, columns=["Category", "hours"])
+    hours["hours"] = hours["hours"].astype(float)
+    grouped = hours.groupby("Category")["hours"]
+    return pd.DataFrame(
+        {
+            "Resolved": grouped.size(),
+            "Median (hours)": grouped.median().round(1),
+            "P90 (hours)": grouped.quantile(0.9).round(1),
+        }
+    ).sort_values("Resolved", ascending=False)
+
+
+@st.cache_data(ttl=ANALYTICS_TTL)
+def load_open_ages():
+    # Counted inside idx_complaints_status_created, without reading rows
+    now = dt.datetime.now()
+    bounds = [now - dt.timedelta(days=days) for _, days in AGE_BUCKETS[1:]]
+    cases = " ".join(f"WHEN created_at > %s THEN {i}" for i in range(len(bounds)))
+    conn = get_connection()
+    if not conn:
+        return None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT CASE {cases} ELSE {len(bounds)} END AS bucket, COUNT(*) "
+            "FROM complaints WHERE status IN ('Open', 'In Progress') GROUP BY bucket",
+            bounds,
+        )
+        counts = dict(cursor.fetchall())
+    finally:
+        conn.close()
+    return pd.Series(
+        [counts.get(i, 0) for i in range(len(AGE_BUCKETS))],
+        index=[label for label, _ in AGE_BUCKETS],
+        name="Open complaints",
+    )
+
+
+def archive_complaints(
+    conn,
+    older_than_days=ARCHIVE_AFTER_DAYS,
+    batch_size=ARCHIVE_BATCH_SIZE,
+    progress=None,
+):
+    # Moves complaints that have been Resolved/Closed for older_than_days to
+    # complaints_archive, one bounded batch per transaction, so row locks are
+    # only held for a single batch. Age counts from the last status change in
+    # complaint_status_history; created_at only narrows the scan, since a
+    # complaint cannot have been resolved before it was submitted.
+    # Roll up completed days first, so the backlog history keeps archived rows
+    refresh_daily_rollup(conn)
+    cutoff = dt.datetime.now() - dt.timedelta(days=older_than_days)
+    cursor = conn.cursor()
+    moved = 0
+    while True:
+        try:
+            cursor.execute(
+                "SELECT c.id FROM complaints c "
+                "WHERE c.status IN ('Resolved', 'Closed') AND c.created_at < %s "
+                "AND NOT EXISTS (SELECT 1 FROM complaint_status_history h "
+                "WHERE h.complaint_id = c.id AND h.changed_at >= %s) "
+                "LIMIT %s FOR UPDATE",
+                (cutoff, cutoff, batch_size),
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                conn.commit()
+                return moved
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f"INSERT INTO complaints_archive ({COMPLAINT_COLUMNS}) "
+                f"SELECT {COMPLAINT_COLUMNS} FROM complaints WHERE id IN ({placeholders})",
+                ids,
+            )
+            cursor.execute(f"DELETE FROM complaints WHERE id IN ({placeholders})", ids)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        moved += len(ids)
+        if progress:
+            progress(moved)
+
+
+def show_analytics():
+    st.subheader("📈 Complaint Analytics")
+    st.caption(f"Figures are cached for {ANALYTICS_TTL // 60} minutes.")
+    st.markdown("**Backlog by status**")
+    days = st.selectbox(
+        "Period:", [30, 90, 365], format_func=lambda d: f"Last {d} days"
+    )
+    backlog = load_backlog(days)
+    if backlog is None:
+        # get_connection has shown the error; don't keep the miss cached
+        load_backlog.clear()
+        return
+    if backlog.empty:
+        st.info("No complaints yet.")
+        return
+    st.area_chart(backlog)
+
+    st.markdown("**Time to resolve by category**")
+    col1, col2 = st.columns(2)
+    end = col2.date_input("To:", dt.date.today())
+    start = col1.date_input("From:", end - dt.timedelta(days=days))
+    resolution = load_resolution_times(start, end)
+    if resolution is None:
+        load_resolution_times.clear()
+    elif resolution.empty:
+        st.info("No complaints were resolved in this period.")
+    else:
+        st.dataframe(resolution, use_container_width=True)
+
+    st.markdown("**Age of open complaints**")
+    ages = load_open_ages()
+    if ages is None:
+        load_open_ages.clear()
+    else:
+        st.bar_chart(ages)
+
+    with st.expander("Maintenance"):
+        older_than = st.number_input(
+            "Archive complaints Resolved/Closed for more than (days):",
+            min_value=1,
+            value=ARCHIVE_AFTER_DAYS,
+        )
+        if st.button("Archive Now"):
+            conn = get_connection()
+            if conn:
+                status = st.empty()
+                try:
+                    moved = archive_complaints(
+                        conn,
+                        older_than,
+                        progress=lambda moved: status.write(f"Archived {moved}..."),
+                    )
+                    status.success(f"✅ {moved} complaints moved to the archive.")
+                finally:
+                    conn.close()
+
+
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
     st.session_state.user_role = None
@@ -74,8 +1280,14 @@ def user_section():
         st.subheader("➕ Register Your Complaint")
         with st.form("complaint_form"):
             name, email = (
-                st.text_input("Full Name:", placeholder="Enter your full name"),
-                st.text_input("Email:", placeholder="Enter your email"),
+                st.text_input(
+                    "Full Name:",
+                    placeholder="Enter your full name",
+                    max_chars=FIELD_MAX_CHARS,
+                ),
+                st.text_input(
+                    "Email:", placeholder="Enter your email", max_chars=FIELD_MAX_CHARS
+                ),
             )
             category = st.selectbox(
                 "Complaint Category:",
@@ -101,28 +1313,26 @@ def user_section():
                     errors.append("Please enter a valid email!")
                 if not description or len(description.strip()) < 10:
                     errors.append("Description must be at least 10 characters!")
+                errors.extend(complaint_errors(name, email, category, description))
                 if errors:
                     for error in errors:
                         st.error(error)
                 else:
-                    conn = get_connection()
-                    if conn:
-                        cursor = conn.cursor()
-                        try:
-                            cursor.execute(
-                                "INSERT INTO complaints (name, email, category, description, status) VALUES (%s, %s, %s, %s, 'Open')",
-                                (name, email, category, description),
+                    try:
+                        complaint_id = submit_complaint(
+                            name, email, category, description
+                        )
+                        st.success("✅ Complaint submitted successfully!")
+                        st.info(f"📌 Your Complaint ID: **{complaint_id}**")
+                        st.write("Please save this ID to track your complaint status.")
+                        matches = flag_duplicates(complaint_id, description)
+                        if matches:
+                            st.caption(
+                                "Similar complaints have already been reported; "
+                                "yours has been grouped with them."
                             )
-                            conn.commit()
-                            st.success("✅ Complaint submitted successfully!")
-                            st.info(f"📌 Your Complaint ID: **{cursor.lastrowid}**")
-                            st.write(
-                                "Please save this ID to track your complaint status."
-                            )
-                        except Exception as e:
-                            st.error(f"Error submitting complaint: {e}")
-                        finally:
-                            conn.close()
+                    except Exception as e:
+                        st.error(f"Error submitting complaint: {e}")
 
     elif menu == "Track Complaint":
         st.subheader("🔍 Track Your Complaint")
@@ -131,11 +1341,7 @@ def user_section():
             conn = get_connection()
             if conn:
                 cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id, name, email, category, description, status, created_at FROM complaints WHERE id = %s",
-                    (complaint_id,),
-                )
-                complaint = cursor.fetchone()
+                complaint = find_complaint(cursor, complaint_id)
                 conn.close()
                 if complaint:
                     st.markdown("---")
@@ -154,63 +1360,166 @@ def admin_section():
     st.title("👨‍💼 Admin Dashboard")
     menu = st.sidebar.radio(
         "Admin Menu",
-        ["View All Complaints", "Search Complaint", "Update Status", "Logout"],
+        [
+            "View All Complaints",
+            "Search Complaint",
+            "Update Status",
+            "Analytics",
+            "Logout",
+        ],
     )
 
     if menu == "View All Complaints":
         st.subheader("📋 All Complaints")
-        filter_status = st.selectbox(
-            "Filter by Status:", ["All", "Open", "In Progress", "Resolved", "Closed"]
-        )
+        if st.toggle("Group by cluster"):
+            conn = get_connection()
+            if conn:
+                try:
+                    show_clusters(conn)
+                finally:
+                    conn.close()
+            return
+        col1, col2 = st.columns([3, 1])
+        filter_status = col1.selectbox("Filter by Status:", ["All"] + STATUSES)
+        page_size = col2.selectbox("Page Size:", PAGE_SIZES, index=1)
+        # Stack of keyset cursors, one per page visited; reset when the view changes
+        view = (filter_status, page_size)
+        if st.session_state.get("complaints_view") != view:
+            st.session_state.complaints_view = view
+            st.session_state.complaints_pages = [None]
+        pages = st.session_state.complaints_pages
         conn = get_connection()
         if conn:
             cursor = conn.cursor()
-            query = "SELECT id, name, email, category, description, status, created_at FROM complaints"
-            params = ()
-            if filter_status != "All":
-                query += " WHERE status = %s"
-                params = (filter_status,)
-            query += " ORDER BY created_at DESC"
-            cursor.execute(query, params)
-            complaints = cursor.fetchall()
-            conn.close()
-            if complaints:
-                st.markdown(f"**Total Complaints:** {len(complaints)}\n---")
-                for complaint in complaints:
-                    with st.expander(
-                        f"ID: {complaint[0]} | {complaint[2]} | {complaint[3]} | Status: {complaint[5]}"
-                    ):
-                        display_complaint(complaint)
-            else:
-                st.info("No complaints found.")
+            try:
+                counts = get_status_counts(cursor)
+                complaints, next_key = get_complaints_page(
+                    cursor,
+                    None if filter_status == "All" else filter_status,
+                    pages[-1],
+                    page_size,
+                )
+                columns = st.columns(len(STATUSES) + 1)
+                columns[0].metric("Total", sum(counts.values()))
+                for column, status in zip(columns[1:], STATUSES):
+                    column.metric(
+                        f"{get_status_icon(status)} {status}", counts.get(status, 0)
+                    )
+                # Outcomes of a bulk update, kept across the rerun that refreshes the table
+                if "bulk_outcomes" in st.session_state:
+                    show_transition_outcomes(st.session_state.pop("bulk_outcomes"))
+                if complaints:
+                    selection = st.dataframe(
+                        pd.DataFrame(complaints, columns=LIST_COLUMNS),
+                        use_container_width=True,
+                        hide_index=True,
+                        on_select="rerun",
+                        selection_mode="multi-row",
+                        # A new key after each bulk update clears the selection,
+                        # which refers to row positions in the old page
+                        key=f"complaints_table_{len(pages)}_{st.session_state.get('bulk_updates', 0)}",
+                    )
+                    total = (
+                        sum(counts.values())
+                        if filter_status == "All"
+                        else counts.get(filter_status, 0)
+                    )
+                    col1, col2, col3 = st.columns([1, 2, 1])
+                    if col1.button("⬅️ Previous", disabled=len(pages) == 1):
+                        pages.pop()
+                        st.rerun()
+                    col2.write(f"Page {len(pages)} of {max(1, -(-total // page_size))}")
+                    if col3.button("Next ➡️", disabled=next_key is None):
+                        pages.append(next_key)
+                        st.rerun()
+                    selected = [complaints[row] for row in selection.selection.rows]
+                    if len(selected) == 1:
+                        complaint = get_complaint(cursor, selected[0][0])
+                        if complaint:
+                            st.markdown("---")
+                            display_complaint(complaint)
+                    elif not selected:
+                        st.caption(
+                            "Select a row to view the full complaint, or several rows to update them together."
+                        )
+                    if selected:
+                        col1, col2 = st.columns([3, 1])
+                        new_status = col1.selectbox(
+                            "Move selected to:", STATUSES, key="bulk_status"
+                        )
+                        if col2.button(f"Update {len(selected)} Selected"):
+                            # Each complaint is expected to still have the
+                            # status shown in the table
+                            st.session_state.bulk_outcomes = transition_status(
+                                conn, {row[0]: row[4] for row in selected}, new_status
+                            )
+                            st.session_state.bulk_updates = (
+                                st.session_state.get("bulk_updates", 0) + 1
+                            )
+                            st.rerun()
+                else:
+                    st.info("No complaints found.")
+            finally:
+                conn.close()
 
     elif menu == "Search Complaint":
         st.subheader("🔍 Search Complaint")
-        search_type = st.radio("Search by:", ["Complaint ID", "Email"], horizontal=True)
-        conn = get_connection()
-        if conn:
-            cursor = conn.cursor()
-            if search_type == "Complaint ID":
-                complaint_id = st.number_input("Enter Complaint ID:", min_value=1)
-                if st.button("Search", use_container_width=True):
-                    cursor.execute(
-                        "SELECT id, name, email, category, description, status, created_at FROM complaints WHERE id = %s",
-                        (complaint_id,),
-                    )
-                    complaint = cursor.fetchone()
+        search_type = st.radio(
+            "Search by:", ["Complaint ID", "Email", "Keyword"], horizontal=True
+        )
+        # A connection is only opened once a search is actually submitted
+        if search_type == "Complaint ID":
+            complaint_id = st.number_input("Enter Complaint ID:", min_value=1)
+            if st.button("Search", use_container_width=True):
+                conn = get_connection()
+                if conn:
+                    complaint = find_complaint(conn.cursor(), complaint_id)
+                    conn.close()
                     if complaint:
                         st.markdown("---")
                         display_complaint(complaint)
                     else:
                         st.error("Complaint not found!")
-            else:
-                email = st.text_input("Enter Email Address:")
-                if st.button("Search", use_container_width=True):
+        elif search_type == "Keyword":
+            keywords = st.text_input(
+                "Enter Keywords:", placeholder='e.g. refund "late delivery"'
+            )
+            if keywords.strip():
+                page = st.number_input("Page:", min_value=1, value=1)
+                conn = get_connection()
+                if conn:
+                    try:
+                        total, complaints = search_complaints(
+                            conn.cursor(), keywords, page
+                        )
+                    finally:
+                        conn.close()
+                    if complaints:
+                        first = (page - 1) * SEARCH_PAGE_SIZE + 1
+                        st.markdown(
+                            f"**Matches:** {first}–{first + len(complaints) - 1} of {total}\n---"
+                        )
+                        for complaint in complaints:
+                            with st.expander(
+                                f"ID: {complaint[0]} | {complaint[3]} | Status: {complaint[5]}"
+                            ):
+                                display_complaint(complaint)
+                    elif total:
+                        st.info(f"Only {total} matches — go back to an earlier page.")
+                    else:
+                        st.error("No complaints match these keywords!")
+        else:
+            email = st.text_input("Enter Email Address:")
+            if st.button("Search", use_container_width=True):
+                conn = get_connection()
+                if conn:
+                    cursor = conn.cursor()
                     cursor.execute(
                         "SELECT id, name, email, category, description, status, created_at FROM complaints WHERE email = %s ORDER BY created_at DESC",
                         (email,),
                     )
                     complaints = cursor.fetchall()
+                    conn.close()
                     if complaints:
                         st.markdown(f"**Total Complaints:** {len(complaints)}\n---")
                         for complaint in complaints:
@@ -220,38 +1529,37 @@ def admin_section():
                                 display_complaint(complaint)
                     else:
                         st.error("No complaints found for this email!")
-            conn.close()
 
     elif menu == "Update Status":
         st.subheader("📝 Update Complaint Status")
-        complaint_id = st.number_input("Enter Complaint ID:", min_value=1)
-        new_status = st.selectbox(
-            "New Status:", ["Open", "In Progress", "Resolved", "Closed"]
+        ids_text = st.text_input("Complaint IDs:", placeholder="e.g. 12, 15, 27")
+        col1, col2 = st.columns(2)
+        expected = col1.selectbox("Current Status:", STATUSES)
+        new_status = col2.selectbox("New Status:", STATUSES, index=1)
+        st.caption(
+            "Only complaints still in the current status are updated; the rest are reported as skipped."
         )
-        conn = get_connection()
-        if conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, name, email, category, status, created_at FROM complaints WHERE id = %s",
-                (complaint_id,),
-            )
-            complaint = cursor.fetchone()
-            if complaint:
-                col1, col2 = st.columns(2)
-                col1.markdown(f"**Name:** {complaint[1]}\n**Category:** {complaint[3]}")
-                col2.markdown(
-                    f"**Current Status:** {complaint[4]}\n**Created:** {complaint[5]}"
-                )
-                if st.button("Update Status", use_container_width=True):
-                    cursor.execute(
-                        "UPDATE complaints SET status = %s WHERE id = %s",
-                        (new_status, complaint_id),
-                    )
-                    conn.commit()
-                    st.success(f"✅ Status updated to: {new_status}")
+        if st.button("Update Status", use_container_width=True):
+            complaint_ids = parse_complaint_ids(ids_text)
+            if not complaint_ids:
+                st.error("Enter at least one complaint ID!")
+            elif len(complaint_ids) > MAX_BULK_IDS:
+                st.error(f"At most {MAX_BULK_IDS} complaints can be updated at once!")
+            elif expected == new_status:
+                st.error("New status must differ from the current status!")
             else:
-                st.error("Complaint not found!")
-            conn.close()
+                conn = get_connection()
+                if conn:
+                    try:
+                        outcomes = transition_status(
+                            conn, dict.fromkeys(complaint_ids, expected), new_status
+                        )
+                    finally:
+                        conn.close()
+                    show_transition_outcomes(outcomes)
+
+    elif menu == "Analytics":
+        show_analytics()
 
     elif menu == "Logout":
         st.session_state.logged_in = False
@@ -0,0 +1,276 @@
+import itertools
+import json
+
+import pytest
+
+import compliant
+
+
+class FakeAllocator:
+    def __init__(self):
+        self.ids = itertools.count(1)
+
+    def allocate(self):
+        return next(self.ids)
+
+    def release(self, complaint_ids):
+        pass
+
+
+class RecordingIngestor(compliant.ComplaintIngestor):
+    # Records writes instead of talking to MySQL; the background writer is
+    # disabled so the queue only drains when a test says so
+    fail_writes = False
+
+    def __init__(self, wal_path):
+        self.written = []
+        super().__init__(FakeAllocator(), str(wal_path))
+
+    def run(self):
+        pass
+
+    def write(self, rows, set_aside=True):
+        if self.fail_writes:
+            raise RuntimeError("database unavailable")
+        self.written.extend(rows)
+        return []
+
+
+def wal_ids(wal_path):
+    with open(wal_path, encoding="utf-8") as wal:
+        return [json.loads(line)[0] for line in wal]
+
+
+def test_recover_replays_wal_and_skips_torn_line(tmp_path):
+    wal_path = tmp_path / "complaints.wal"
+    record = [7, "Asha", "asha@example.com", "Other", "Lift broken", "Open"]
+    wal_path.write_text(
+        json.dumps(record + ["2026-01-02 03:04:05"]) + '\n[8, "torn', encoding="utf-8"
+    )
+    ingestor = RecordingIngestor(wal_path)
+    assert [row[0] for row in ingestor.written] == [7]
+    assert ingestor.written[0][6] == compliant.dt.datetime(2026, 1, 2, 3, 4, 5)
+    assert wal_ids(wal_path) == []
+
+
+def test_queue_full_writes_inline(tmp_path, monkeypatch):
+    monkeypatch.setattr(compliant, "INGEST_QUEUE_SIZE", 1)
+    wal_path = tmp_path / "complaints.wal"
+    ingestor = RecordingIngestor(wal_path)
+    queued = ingestor.submit("Asha", "asha@example.com", "Other", "Lift broken")
+    inline = ingestor.submit("Ravi", "ravi@example.com", "Other", "Lift broken")
+    assert [row[0] for row in ingestor.written] == [inline]
+    assert ingestor.find_pending(queued) is not None
+    assert ingestor.find_pending(inline) is None
+
+
+def test_failed_inline_write_is_not_replayed(tmp_path, monkeypatch):
+    monkeypatch.setattr(compliant, "INGEST_QUEUE_SIZE", 1)
+    wal_path = tmp_path / "complaints.wal"
+    ingestor = RecordingIngestor(wal_path)
+    queued = ingestor.submit("Asha", "asha@example.com", "Other", "Lift broken")
+    ingestor.fail_writes = True
+    with pytest.raises(RuntimeError):
+        ingestor.submit("Ravi", "ravi@example.com", "Other", "Lift broken")
+    assert list(ingestor.pending) == [queued]
+    assert wal_ids(wal_path) == [queued]
+
+
+def test_wal_is_compacted_while_rows_are_pending(tmp_path, monkeypatch):
+    monkeypatch.setattr(compliant, "WAL_COMPACT_ROWS", 2)
+    wal_path = tmp_path / "complaints.wal"
+    ingestor = RecordingIngestor(wal_path)
+    ids = [
+        ingestor.submit("Asha", "asha@example.com", "Other", "Lift broken")
+        for _ in range(3)
+    ]
+    ingestor.mark_written([ingestor.pending[ids[0]]])
+    assert wal_ids(wal_path) == ids
+    ingestor.mark_written([ingestor.pending[ids[1]]])
+    assert wal_ids(wal_path) == [ids[2]]
+    ingestor.submit("Ravi", "ravi@example.com", "Other", "Lift broken")
+    assert wal_ids(wal_path) == [ids[2], 4]
+
+
+class TooLongCursor:
+    # Refuses any batch holding a name longer than the name column, the way
+    # MySQL does in strict mode
+    def __init__(self, connection):
+        self.connection = connection
+
+    def executemany(self, query, rows):
+        if any(len(row[1]) > compliant.FIELD_MAX_CHARS for row in rows):
+            raise compliant.pymysql.err.DataError(
+                1406, "Data too long for column 'name'"
+            )
+        self.connection.staged.extend(rows)
+
+
+class TooLongConnection:
+    def __init__(self):
+        self.staged, self.committed = [], []
+
+    def cursor(self):
+        return TooLongCursor(self)
+
+    def commit(self):
+        self.committed.extend(self.staged)
+        self.staged = []
+
+    def rollback(self):
+        self.staged = []
+
+
+def test_refused_row_is_set_aside_and_rest_of_batch_written(tmp_path):
+    wal_path = tmp_path / "complaints.wal"
+    ingestor = RecordingIngestor(wal_path)
+    ingestor.conn = TooLongConnection()
+    opened = compliant.dt.datetime(2026, 1, 2, 3, 4, 5)
+    rows = [
+        (complaint_id, name, "a@example.com", "Other", "Lift broken", "Open", opened)
+        for complaint_id, name in [
+            (1, "Asha"),
+            (2, "x" * 101),
+            (3, "Ravi"),
+            (4, "Meena"),
+        ]
+    ]
+    refused = compliant.ComplaintIngestor.write(ingestor, rows)
+    assert [row[0] for row in refused] == [2]
+    assert [row[0] for row in ingestor.conn.committed] == [1, 3, 4]
+    assert wal_ids(str(wal_path) + ".rejected") == [2]
+
+
+def test_submit_complaint_checks_lengths_before_allocating(monkeypatch):
+    def unreachable():
+        raise AssertionError("an ID was allocated")
+
+    monkeypatch.setattr(compliant, "get_ingestor", unreachable)
+    monkeypatch.setattr(compliant, "get_id_allocator", unreachable)
+    with pytest.raises(ValueError, match="Name"):
+        compliant.submit_complaint("x" * 101, "a@example.com", "Other", "Lift broken")
+    with pytest.raises(ValueError, match="Description"):
+        compliant.submit_complaint("Asha", "a@example.com", "Other", "é" * 40000)
+
+
+def test_duplicate_log_restores_clusters(tmp_path):
+    log_path = str(tmp_path / "duplicates.jsonl")
+    text = "The power outage in sector 7 has left our building without electricity since morning"
+    index = compliant.DuplicateIndex(log_path)
+    index.add(1, text)
+    index.add(2, "My refund for order 123 has not been processed after two weeks")
+    assert index.add(3, text + " please help")
+    index.append_log(index.take_unsaved())
+    with open(log_path, "a", encoding="utf-8") as log:
+        log.write('["a", 4, [1, 2')
+    restored = compliant.DuplicateIndex(log_path)
+    assert restored.clusters() == index.clusters() == [[1, 3]]
+    assert set(restored.signatures) == {1, 2, 3}
+
+
+class FakeCursor:
+    def __init__(self, locked, archived=()):
+        self.locked, self.archived = locked, archived
+        self.statements, self.rows = [], []
+
+    def execute(self, query, params):
+        self.statements.append((query, params))
+        if "FOR UPDATE" in query:
+            self.rows = self.locked
+        elif "complaints_archive" in query:
+            self.rows = [(complaint_id,) for complaint_id in self.archived]
+
+    def executemany(self, query, rows):
+        self.statements.append((query, rows))
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self.fake_cursor = cursor
+
+    def cursor(self):
+        return self.fake_cursor
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_transition_status_checks_each_expected_status_in_one_update():
+    opened = compliant.dt.datetime(2026, 1, 1)
+    cursor = FakeCursor(
+        [
+            (1, "Open", "Other", opened),
+            (2, "In Progress", "Other", opened),
+            (3, "Closed", "Other", opened),
+        ],
+        archived=[5],
+    )
+    outcomes = compliant.transition_status(
+        FakeConnection(cursor),
+        {1: "Open", 2: "In Progress", 3: "Open", 4: "Open", 5: "Resolved"},
+        "Resolved",
+    )
+    assert outcomes == {
+        1: "Updated to Resolved",
+        2: "Updated to Resolved",
+        3: "Skipped: status is Closed",
+        4: "Not found",
+        5: "Archived",
+    }
+    updates = [query for query, _ in cursor.statements if query.startswith("UPDATE")]
+    assert updates == [
+        "UPDATE complaints SET status = %s WHERE (id, status) IN ((%s, %s), (%s, %s))"
+    ]
+
+
+class StoredRowsCursor:
+    def __init__(self, rows):
+        self.rows, self.result, self.queries = rows, [], 0
+
+    def execute(self, query, params):
+        self.queries += 1
+        self.result = [row for row in self.rows if row[0] > params[0]]
+        self.result = self.result[: params[1]] if "LIMIT" in query else self.result
+
+    def fetchall(self):
+        return self.result
+
+
+def test_complaint_index_catches_up_on_rows_written_out_of_order():
+    outstanding = {5}
+    index = compliant.ComplaintIndex(
+        lambda: min(outstanding) - 1 if outstanding else None
+    )
+    stored = [(4, "Other", "lift broken"), (6, "Other", "lift stuck")]
+    index.catch_up(StoredRowsCursor(stored))
+    assert index.last_id == 4
+    stored.insert(1, (5, "Other", "lift noisy"))
+    outstanding.clear()
+    index.catch_up(StoredRowsCursor(stored))
+    assert index.last_id == 6
+    assert index.search(["lift"], []) == [6, 5, 4]
+
+
+def test_duplicate_catch_up_reads_in_chunks_and_stops_at_watermark(tmp_path):
+    log_path = str(tmp_path / "duplicates.jsonl")
+    text = "The power outage in sector 7 has left our building without electricity since morning"
+    stored = [
+        (1, text),
+        (2, "My refund for order 123 has not been processed after two weeks"),
+        (3, text + " please help"),
+        (4, "The delivery of my parcel was delayed again by the courier"),
+        (6, text + " again today"),
+    ]
+    index = compliant.DuplicateIndex(log_path, watermark=lambda: 4)
+    cursor = StoredRowsCursor(stored)
+    assert index.catch_up(cursor, chunk_size=2)
+    assert cursor.queries == 3
+    assert index.last_id == 4
+    assert index.clusters() == [[1, 3, 6]]
+    assert compliant.DuplicateIndex(log_path).last_id == 4